@@ -0,0 +1,217 @@
+"""
+Semantic cache of general ChatBot answers.
+
+Repeated general questions ("what is machine learning", "tell me what
+machine learning is") are answered from the cache instead of a new
+generation. Queries are normalized, reduced to their content words and
+embedded with the intent model's hashed n-gram vectorizer; a lookup hits
+the most similar cached query if its cosine similarity is above the
+threshold ("capital of france" and "capital of germany" stay apart).
+
+Answers are only cached when they stand on their own:
+    - the query asks nothing time-sensitive (time, date, today, news, ...)
+      and the answer doesn't quote the date or time ChatBot injects through
+      RealtimeInformation()
+    - the query doesn't lean on the conversation ("what about it",
+      "tell me more", "my name", ...)
+    - the user wouldn't want the same answer twice (jokes, stories, ...)
+
+Entries are evicted least recently used first and expire after a TTL. The
+cache is persisted to Data/AnswerCache.json; vectors are rebuilt on load.
+"""
+
+import os
+import re
+import json
+import time
+import datetime
+import threading
+from collections import OrderedDict
+from dotenv import dotenv_values
+from Backend.IntentMatcher import Normalize
+from Backend.CommandQueue import NormalizeCommand
+from Backend.IntentModel import Vectorize, np
+
+env_vars = dotenv_values(".env")
+AnswerCacheEnabled = env_vars.get("AnswerCache", "1") == "1"
+AnswerCacheSize = int(env_vars.get("AnswerCacheSize", "256"))
+AnswerCacheTTL = float(env_vars.get("AnswerCacheTTL", str(24 * 3600)))
+AnswerCacheThreshold = float(env_vars.get("AnswerCacheThreshold", "0.9"))
+ANSWER_CACHE_FILE = os.path.join("Data", "AnswerCache.json")
+
+# Questions whose answer changes with the clock
+TIME_SENSITIVE = re.compile(
+    r"\b(time|date|day|today|tonight|tomorrow|yesterday|now|current(ly)?|latest|recent(ly)?|news|"
+    r"weather|forecast|this (week|month|year)|next (week|month|year)|last (week|month|year)|"
+    r"how old|age|year|month|season|live|score|price|stock|trending)\b")
+# Questions that refer back to the conversation or to the user
+CONTEXT_DEPENDENT = re.compile(
+    r"\b(it|its|that|this|these|those|they|them|their|he|him|his|she|her|"
+    r"my|mine|i|we|our|us|you said|earlier|before|again|previous|above|last one|"
+    r"more|else|also|instead|then|same|why not|what about|how about)\b")
+# Requests where a repeated answer would be the wrong answer
+VARIED = re.compile(r"\b(joke|story|poem|riddle|random|fun fact|quote|another|surprise|suggest|recommend)s?\b")
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did", "what", "whats", "who",
+    "whos", "how", "why", "when", "where", "which", "of", "in", "on", "at", "to", "for", "about",
+    "and", "or", "can", "could", "would", "should", "will", "tell", "explain", "describe", "define",
+    "please", "give", "show", "mean", "means", "meaning", "by", "with", "as", "from", "some", "me", "you",
+}
+
+def CacheText(query):
+    """'Hey Prism, what's machine learning?' -> 'whats machine learning'"""
+    return NormalizeCommand(Normalize(query))
+
+def ContentText(text):
+    """The words that carry the question: 'whats the capital of france' -> 'capital france'"""
+    return " ".join(word for word in text.split() if word not in STOPWORDS)
+
+def Cacheable(text):
+    """Whether a normalized query can share its answer with other turns"""
+    return bool(ContentText(text)) and not TIME_SENSITIVE.search(text) \
+        and not CONTEXT_DEPENDENT.search(text) and not VARIED.search(text)
+
+def QuotesClock(answer, now=None):
+    """Whether an answer repeats the injected date or time (today's weekday, date, year or clock time)"""
+    now = now or datetime.datetime.now()
+    marks = [now.strftime("%A"), now.strftime("%B %d").replace(" 0", " "), now.strftime("%Y"),
+             now.strftime("%I:%M").lstrip("0"), now.strftime("%H:%M")]
+    return any(mark in answer for mark in marks)
+
+class AnswerCache:
+    def __init__(self, path=ANSWER_CACHE_FILE, maxsize=AnswerCacheSize, ttl=AnswerCacheTTL,
+                 threshold=AnswerCacheThreshold, enabled=AnswerCacheEnabled):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.enabled = enabled
+        # content text -> {"query", "answer", "stored"}, least recently used first
+        self.entries = OrderedDict()
+        self.vectors = {}
+        # Stacked unit vectors of entries, rebuilt after a change
+        self.index = None
+        self.lock = threading.Lock()
+        self.stats_counts = {"hits": 0, "similar_hits": 0, "misses": 0, "skipped": 0,
+                             "stored": 0, "expired": 0, "evicted": 0}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        now = time.time()
+        for text, entry in saved:
+            if now - entry["stored"] < self.ttl:
+                self.insert(text, entry)
+        while len(self.entries) > self.maxsize:
+            self.remove(next(iter(self.entries)))
+
+    def save(self):
+        """Atomic rewrite, so a crash mid-save never leaves a truncated cache"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp = self.path + ".tmp"
+        with open(temp, "w") as f:
+            json.dump(list(self.entries.items()), f)
+        os.replace(temp, self.path)
+
+    def insert(self, text, entry):
+        self.entries[text] = entry
+        self.entries.move_to_end(text)
+        if np is not None:
+            vector = Vectorize([text])[0]
+            norm = np.linalg.norm(vector)
+            self.vectors[text] = vector / norm if norm else vector
+        self.index = None
+
+    def remove(self, text):
+        self.entries.pop(text, None)
+        self.vectors.pop(text, None)
+        self.index = None
+
+    def nearest(self, text):
+        """(cached text, similarity) of the most similar entry (lock held)"""
+        if text in self.entries:
+            return text, 1.0
+        if np is None or not self.entries:
+            return None, 0.0
+        if self.index is None:
+            texts = list(self.vectors)
+            self.index = (texts, np.stack([self.vectors[t] for t in texts]))
+        texts, matrix = self.index
+        query = Vectorize([text])[0]
+        norm = np.linalg.norm(query)
+        if not norm:
+            return None, 0.0
+        scores = matrix @ (query / norm)
+        best = int(np.argmax(scores))
+        return texts[best], float(scores[best])
+
+    def get(self, query):
+        """A cached answer to this query or a near-identical one, or None"""
+        if not self.enabled:
+            return None
+        text = CacheText(query)
+        if not Cacheable(text):
+            with self.lock:
+                self.stats_counts["skipped"] += 1
+            return None
+        text = ContentText(text)
+        with self.lock:
+            match, similarity = self.nearest(text)
+            entry = self.entries.get(match) if match else None
+            if entry and time.time() - entry["stored"] >= self.ttl:
+                self.remove(match)
+                self.stats_counts["expired"] += 1
+                entry = None
+            if entry is None or similarity < self.threshold:
+                self.stats_counts["misses"] += 1
+                return None
+            self.entries.move_to_end(match)
+            self.stats_counts["hits"] += 1
+            if match != text:
+                self.stats_counts["similar_hits"] += 1
+            return entry["answer"]
+
+    def put(self, query, answer, now=None):
+        """Cache a complete answer unless the query or the answer depends on the time or the conversation"""
+        if not self.enabled or not answer:
+            return False
+        text = CacheText(query)
+        if not Cacheable(text) or QuotesClock(answer, now):
+            return False
+        with self.lock:
+            self.insert(ContentText(text), {"query": query, "answer": answer, "stored": time.time()})
+            self.stats_counts["stored"] += 1
+            while len(self.entries) > self.maxsize:
+                self.remove(next(iter(self.entries)))
+                self.stats_counts["evicted"] += 1
+            try:
+                self.save()
+            except OSError as e:
+                print(f"[ANSWER CACHE]: Save failed: {e}")
+        return True
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.vectors.clear()
+            self.index = None
+            self.save()
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.stats_counts, size=len(self.entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def report(self):
+        stats = self.stats()
+        print(f"[ANSWER CACHE]: {stats['hits']} hits ({stats['similar_hits']} similar) / {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%}), {stats['skipped']} not cacheable, {stats['size']} entries, "
+              f"{stats['expired']} expired, {stats['evicted']} evicted")
+
+answers = AnswerCache()
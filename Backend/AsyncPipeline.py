@@ -0,0 +1,177 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import dotenv_values
+from Backend.CommandQueue import PRIORITY_CONTROL
+from Backend.QueryContext import QueryCancelled
+from Backend.TranscriptChannel import channel as transcripts
+
+env_vars = dotenv_values(".env")
+PipelineDepth = int(env_vars.get("PipelineDepth", "2"))
+
+class PipelineClosed(Exception):
+    """The pipeline (or the interpreter) is shutting down; stages stop quietly"""
+
+class AsyncPipeline:
+    """
+    asyncio orchestration of one PrismVoiceCore.
+
+    Four stage coroutines connected by queues:
+        listen   -> transcripts into the core's CommandQueue
+        classify -> decision per command, tasks streamed into a TaskBatch
+        execute  -> handlers via the core's TaskExecutor, results in order
+        speak    -> Speak on a dedicated thread (pyttsx3 is not thread-safe)
+
+    Stages overlap: query N can be spoken while N+1 executes and N+2 is
+    classified. Blocking SDK calls run in executors; every await on behalf of
+    a command is bounded by its QueryContext budget and aborted when the
+    context is cancelled (control command or overrun deadline).
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self.loop = None
+        self.waiters = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prism-wait")
+        self.io = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prism-io")
+        self.tts = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prism-tts")
+        self.results = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prism-results")
+        self.decisions = None
+        self.speech = None
+        # Set once shutdown begins; no new work goes to the executors after that
+        self.closing = False
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.decisions = asyncio.Queue(maxsize=PipelineDepth)
+        self.speech = asyncio.Queue()
+
+        stages = [asyncio.create_task(stage()) for stage in
+                  (self.listen, self.classify, self.execute, self.speak)]
+        try:
+            # listen/classify return once the core stops running
+            done, pending = await asyncio.wait(stages, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() and not isinstance(task.exception(), PipelineClosed):
+                    print(f"[PIPELINE]: Stage failed: {task.exception()}")
+        finally:
+            self.closing = True
+            for task in stages:
+                task.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            for pool in (self.waiters, self.io, self.tts, self.results):
+                pool.shutdown(wait=False)
+
+    async def offload(self, pool, func, *args):
+        if self.closing:
+            raise PipelineClosed()
+        try:
+            future = self.loop.run_in_executor(pool, func, *args)
+        except RuntimeError:
+            # The executors refuse new work once the interpreter shuts down
+            self.closing = True
+            raise PipelineClosed()
+        return await future
+
+    async def guarded(self, command, awaitable):
+        """Await one stage of a command under its deadline and cancellation"""
+        task = asyncio.ensure_future(awaitable)
+        cancel = lambda: self.loop.call_soon_threadsafe(task.cancel)
+        command.ctx.on_cancel(cancel)
+        try:
+            # Backends return partial answers at the deadline; this bounds the rest
+            return await asyncio.wait_for(task, command.ctx.wait_limit())
+        except asyncio.TimeoutError:
+            command.ctx.cancel("deadline exceeded")
+            raise QueryCancelled("deadline exceeded")
+        except asyncio.CancelledError:
+            if command.ctx.cancelled:
+                raise QueryCancelled(command.ctx.reason)
+            raise
+        finally:
+            # One callback per awaited stage would otherwise pile up on the context
+            command.ctx.remove_cancel(cancel)
+
+    async def listen(self):
+        cursor = transcripts.last_seq
+        while self.core.running:
+            record = await self.offload(self.waiters, transcripts.get, cursor, 1)
+            if record is None:
+                continue
+            cursor = record.seq
+            query = self.core.accept_utterance(record)
+            if query:
+                self.core.submit_command(query, record=record)
+
+    async def classify(self):
+        while self.core.running:
+            command = await self.offload(self.waiters, self.core.command_queue.get, 1)
+            if command is None:
+                continue
+
+            self.core.begin_command(command)
+            print(f"\n[USER SAID]: {command.text}")
+            self.core.bus.publish('transcript', command.text)
+            self.core.set_status('Processing...')
+
+            # execute starts on the first task while the rest are still being decided
+            batch = self.core.executor.batch(command.ctx)
+            await self.decisions.put((command, batch))
+
+            try:
+                if command.priority == PRIORITY_CONTROL:
+                    task = command.control_task
+                    if task == "exit":
+                        self.core.command_queue.clear()
+                    self.core.dispatch_decision(command.text, command.ctx, batch, [task] if task else [])
+                else:
+                    await self.guarded(command, self.offload(self.io, self.core.dispatch_decision,
+                                                             command.text, command.ctx, batch))
+            except QueryCancelled as e:
+                print(f"[CANCELLED]: {command.text} ({e})")
+            except PipelineClosed:
+                raise
+            except Exception as e:
+                print(f"[ERROR]: Decision failed: {e}")
+
+    async def execute(self):
+        while True:
+            command, batch = await self.decisions.get()
+            results = batch.results()
+            try:
+                # One result at a time, in order, as jobs are added and finish
+                while True:
+                    item = await self.guarded(command, self.offload(self.results, next, results, None))
+                    if item is None:
+                        break
+                    job, response, error = item
+                    if error:
+                        print(f"[ERROR]: {job.name} failed: {error}")
+                        continue
+                    if response:
+                        await self.speech.put((command, response))
+            except QueryCancelled as e:
+                print(f"[CANCELLED]: {command.text} ({e})")
+            finally:
+                # End-of-command marker for the speak stage
+                await self.speech.put((command, None))
+
+    async def speak(self):
+        while True:
+            command, response = await self.speech.get()
+
+            if response is None:
+                self.core.finish_command(command)
+                if not self.core.inflight:
+                    self.core.set_status('Listening...')
+                continue
+
+            if command.ctx.cancelled:
+                continue
+            try:
+                await self.offload(self.tts, self.core.speak_response, response, command.ctx)
+            except QueryCancelled:
+                # Preempted while a streamed answer was being spoken
+                continue
+            except PipelineClosed:
+                raise
+            except Exception as e:
+                print(f"[ERROR]: Speech failed: {e}")
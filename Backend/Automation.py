@@ -126,8 +126,8 @@ def PlayMusic(song_name):
     except Exception as e:
         return f"Error playing music: {str(e)}"
 
-def VolumeUp():
-    """Increase system volume"""
+def VolumeUp(steps=1):
+    """Increase system volume by steps of 10%"""
     try:
         if os.name == 'nt':  # Windows
             from ctypes import cast, POINTER
@@ -139,17 +139,17 @@ def VolumeUp():
             volume = cast(interface, POINTER(IAudioEndpointVolume))
             
             current_volume = volume.GetMasterVolumeLevelScalar()
-            new_volume = min(current_volume + 0.1, 1.0)
+            new_volume = min(current_volume + 0.1 * steps, 1.0)
             volume.SetMasterVolumeLevelScalar(new_volume, None)
             return f"Volume increased to {int(new_volume * 100)}%"
         else:
-            os.system("amixer -D pulse sset Master 10%+")
+            os.system(f"amixer -D pulse sset Master {10 * steps}%+")
             return "Volume increased"
     except Exception as e:
         return f"Error adjusting volume: {str(e)}"
 
-def VolumeDown():
-    """Decrease system volume"""
+def VolumeDown(steps=1):
+    """Decrease system volume by steps of 10%"""
     try:
         if os.name == 'nt':  # Windows
             from ctypes import cast, POINTER
@@ -161,11 +161,11 @@ def VolumeDown():
             volume = cast(interface, POINTER(IAudioEndpointVolume))
             
             current_volume = volume.GetMasterVolumeLevelScalar()
-            new_volume = max(current_volume - 0.1, 0.0)
+            new_volume = max(current_volume - 0.1 * steps, 0.0)
             volume.SetMasterVolumeLevelScalar(new_volume, None)
             return f"Volume decreased to {int(new_volume * 100)}%"
         else:
-            os.system("amixer -D pulse sset Master 10%-")
+            os.system(f"amixer -D pulse sset Master {10 * steps}%-")
             return "Volume decreased"
     except Exception as e:
         return f"Error adjusting volume: {str(e)}"
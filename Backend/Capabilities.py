@@ -0,0 +1,95 @@
+"""
+Built-in capabilities, registered with the shared handler registry.
+
+Backends are LazyModule proxies, so registering costs nothing until a
+task actually runs. Tasks sharing a lane run one at a time: ChatBot,
+RealtimeSearchEngine and content writing all append to the conversation
+store, so its turns stay in order. General and realtime answers stream
+sentence by sentence to speech (see SpeechStream).
+"""
+
+from Backend.LazyLoader import LazyModule
+from Backend.Handlers import (registry, QueryArgument, NoArguments, StepsArgument,
+                              PRIORITY_INSTANT, PRIORITY_FAST, PRIORITY_SLOW)
+
+Chatbot = LazyModule("Backend.Chatbot")
+Automation = LazyModule("Backend.Automation")
+Search = LazyModule("Backend.RealtimeSearchEngine")
+ImageGeneration = LazyModule("Backend.ImageGeneration")
+Content = LazyModule("Backend.Content")
+Reminder = LazyModule("Backend.Reminder")
+
+# Phrasings of system tasks not covered by an exact prefix, checked in order
+# ('unmute' before 'mute')
+SYSTEM_KEYWORDS = [
+    ("unmute", "Unmute"),
+    ("mute", "Mute"),
+    ("volume up", "VolumeUp"),
+    ("increase volume", "VolumeUp"),
+    ("volume down", "VolumeDown"),
+    ("decrease volume", "VolumeDown"),
+    ("screenshot", "Screenshot"),
+]
+
+@registry.register("general", parser=QueryArgument, accepts_ctx=True, streams=True, lane="chatlog",
+                   timeout=60, priority=PRIORITY_SLOW)
+def General(query, ctx=None, stream=None):
+    return Chatbot.ChatBot(query, ctx, stream=stream)
+
+@registry.register("realtime", parser=QueryArgument, accepts_ctx=True, streams=True, lane="chatlog",
+                   timeout=60, priority=PRIORITY_SLOW)
+def Realtime(query, ctx=None, stream=None):
+    return Search.RealtimeSearchEngine(query, ctx, stream=stream)
+
+@registry.register("content", accepts_ctx=True, lane="chatlog", timeout=90, priority=PRIORITY_SLOW)
+def WriteContent(topic, ctx=None):
+    return Content.WriteContent(topic, ctx)
+
+@registry.register("generate image", accepts_ctx=True, lane="image", timeout=120, priority=PRIORITY_SLOW)
+def GenerateImage(prompt, ctx=None):
+    return ImageGeneration.GenerateImageWithRetry(prompt, ctx=ctx)
+
+@registry.register("open", timeout=15, priority=PRIORITY_INSTANT)
+def Open(target):
+    if target.startswith("http"):
+        return Automation.OpenWebsite(target)
+    return Automation.OpenApplication(target)
+
+@registry.register("close", timeout=15, priority=PRIORITY_INSTANT)
+def Close(app):
+    return Automation.CloseApplication(app)
+
+@registry.register("play", timeout=15, priority=PRIORITY_INSTANT)
+def Play(song):
+    return Automation.PlayMusic(song)
+
+@registry.register("google search", timeout=15, priority=PRIORITY_INSTANT)
+def GoogleSearch(query):
+    return Automation.GoogleSearch(query)
+
+@registry.register("youtube search", timeout=15, priority=PRIORITY_INSTANT)
+def YoutubeSearch(query):
+    return Automation.YoutubeSearch(query)
+
+@registry.register("reminder", timeout=5, priority=PRIORITY_FAST)
+def SetReminder(text):
+    return Reminder.SetReminder(text)
+
+def register_system(prefix, action, parser=NoArguments):
+    registry.register(prefix, lambda *args: getattr(Automation, action)(*args), parser=parser,
+                      lane="system", timeout=10, priority=PRIORITY_INSTANT, name="system")
+
+# 'system volume up 3' comes from merged steps (see TaskOptimizer)
+register_system("system volume up", "VolumeUp", StepsArgument)
+register_system("system volume down", "VolumeDown", StepsArgument)
+register_system("system mute", "Mute")
+register_system("system unmute", "Unmute")
+register_system("system screenshot", "Screenshot")
+
+@registry.register("system", lane="system", timeout=10, priority=PRIORITY_INSTANT)
+def System(command):
+    command = command.lower()
+    for keyword, action in SYSTEM_KEYWORDS:
+        if keyword in command:
+            return getattr(Automation, action)()
+    return f"Unknown system command: {command}"
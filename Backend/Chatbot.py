@@ -1,7 +1,14 @@
-import os
+import time
 import datetime
-from json import load, dump
 from dotenv import dotenv_values
+from Backend.Tracer import tracer
+from Backend.QueryContext import RemainingBudget
+from Backend.ConversationStore import store
+from Backend.CircuitBreaker import health, CircuitOpen
+from Backend.Hedging import hedger
+from Backend.AnswerCache import answers
+from Backend.Memory import memory
+from Backend.HttpPool import CerebrasClient, CohereClient
 
 # Load Environment Variables
 env_vars = dotenv_values(".env")
@@ -9,24 +16,31 @@ Username = env_vars.get("Username", "User")
 Assistantname = "Prism"
 CerebrasAPIKey = env_vars.get("CerebrasAPIKey")
 CohereAPIKey = env_vars.get("CohereAPIKey")
+# Optional endpoint overrides (proxies, local stand-ins for benchmarks)
+CerebrasBaseURL = env_vars.get("CerebrasBaseURL")
+CohereBaseURL = env_vars.get("CohereBaseURL")
+# Per-request caps in seconds, shortened further by the query's remaining budget
+CerebrasTimeout = float(env_vars.get("CerebrasTimeout", "30"))
+CohereTimeout = float(env_vars.get("CohereTimeout", "30"))
 
-# --- Initialize Clients ---
+# Spoken when the budget runs out before any answer arrived
+TimeoutAnswer = "Sorry, that's taking too long. Please ask me again in a moment."
+# Spoken when every provider failed
+FailureAnswer = "I apologize, but I'm having trouble connecting to the servers right now. Please check your internet or API keys."
+
+# --- Initialize Clients (shared, on the keep-alive connection pool) ---
 cerebras_client = None
 cohere_client = None
 
 # Try Initializing Cerebras
 try:
-    from cerebras.cloud.sdk import Cerebras
-    if CerebrasAPIKey:
-        cerebras_client = Cerebras(api_key=CerebrasAPIKey)
+    cerebras_client = CerebrasClient()
 except Exception as e:
     print(f"⚠️ Cerebras Client Warning: {e}")
 
 # Try Initializing Cohere (Backup)
 try:
-    import cohere
-    if CohereAPIKey:
-        cohere_client = cohere.Client(api_key=CohereAPIKey)
+    cohere_client = CohereClient()
 except Exception as e:
     print(f"⚠️ Cohere Client Warning: {e}")
 
@@ -38,20 +52,8 @@ System = f"""You are Prism, an advanced AI assistant for {Username}.
 - Reply in English only
 - Be helpful and direct"""
 
-# Ensure Data directory exists
-if not os.path.exists("Data"):
-    os.makedirs("Data")
-
-# Initialize ChatLog
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-        if len(messages) > 10:
-            messages = messages[-10:]
-except (FileNotFoundError, ValueError):
-    messages = []
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump(messages, f)
+# What prompts used to carry (the last 10 turns); memory reports its savings against it
+HistoryTurns = 10
 
 def RealtimeInformation():
     now = datetime.datetime.now()
@@ -61,91 +63,242 @@ def AnswerModifier(Answer):
     lines = [line for line in Answer.split('\n') if line.strip()]
     return '\n'.join(lines).strip()
 
-def ChatBot(Query):
+def LoadHistory(Query):
+    """Summary of the conversation and the turns relevant to Query (see Memory)"""
+    return memory.context(Query, HistoryTurns)
+
+def SystemPrompt(summary=""):
+    return System + (f"\n\n{summary}" if summary else "") + f"\n{RealtimeInformation()}"
+
+def SaveExchange(Query, Answer):
+    """Append one question/answer pair to the conversation store"""
+    store.append_exchange(Query, Answer)
+
+def CohereHistory(history):
+    """Chat messages in Cohere's format, without the current query"""
+    chat_history = []
+    for msg in history[:-1]:
+        if msg["role"] == "user":
+            chat_history.append({"role": "USER", "message": msg["content"]})
+        elif msg["role"] == "assistant":
+            chat_history.append({"role": "CHATBOT", "message": msg["content"]})
+    return chat_history
+
+def CerebrasDeltas(preamble, history, ctx=None, stop=None):
+    """Text deltas of a streamed Cerebras answer; ends early once stop is set"""
+    completion = cerebras_client.chat.completions.create(
+        model="llama-3.3-70b",
+        messages=[{"role": "system", "content": preamble}] + history,
+        max_tokens=512,
+        temperature=0.7,
+        top_p=0.95,
+        stream=True,
+        timeout=RemainingBudget(ctx, CerebrasTimeout)
+    )
+    try:
+        for chunk in completion:
+            if stop is not None and stop.is_set():
+                break
+            if chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        completion.close()
+
+def CohereDeltas(Query, preamble, history, ctx=None, stop=None):
+    """Text deltas of a streamed Cohere answer (the hedge); ends early once stop is set"""
+    events = cohere_client.chat_stream(
+        model="command-r-plus-08-2024",
+        message=Query,
+        chat_history=CohereHistory(history),
+        preamble=preamble,
+        temperature=0.7,
+        request_options={"timeout_in_seconds": RemainingBudget(ctx, CohereTimeout)}
+    )
+    for event in events:
+        if stop is not None and stop.is_set():
+            break
+        if event.event_type == "text-generation" and event.text:
+            yield event.text
+
+def ChatBot(Query, ctx=None, save=True, progress=None, stream=None):
     """
     Process query with Automatic Fallback:
     1. Cerebras (Llama 3.3) -> Fastest/Best
     2. Cohere (Command-R) -> Reliable Backup
+    While Cerebras' circuit breaker is open, queries go straight to Cohere. With
+    HedgeRequests, Cohere is also asked when Cerebras' first token is late.
+    Self-contained, time-independent questions asked before are answered from
+    the answer cache without a generation.
+
+    ctx (QueryContext, optional): aborts the stream when the query is preempted;
+    at its deadline returns the partial answer so far (or a short fallback)
+    save (bool): False leaves the conversation store untouched, e.g. for a speculative
+    answer that may be thrown away; commit it later with SaveExchange
+    progress (dict, optional): progress["chunks"] counts streamed chunks; progress["complete"]
+    is set when a new answer was generated, True unless it was cut short
+    stream (SentenceStream, optional): receives the answer as it streams, so speech
+    can start at the first sentence; the caller closes it
     """
-    global cerebras_client, cohere_client, messages
+    global cerebras_client, cohere_client
     
-    # Update History
-    try:
-        with open(r"Data\ChatLog.json", "r") as f:
-            messages = load(f)
-    except:
-        messages = []
+    cached = answers.get(Query)
+    if cached is not None:
+        print("[ANSWER CACHE]: Answering from an earlier generation")
+        if stream is not None:
+            stream.feed(cached)
+        if save:
+            SaveExchange(Query, cached)
+        return cached
 
-    messages.append({"role": "user", "content": Query})
-    if len(messages) > 10: messages = messages[-10:]
+    # Work on a copy of the history; only SaveExchange writes it back
+    summary, history = LoadHistory(Query)
+    history.append({"role": "user", "content": Query})
+    preamble = SystemPrompt(summary)
 
     Answer = ""
     used_provider = "None"
+    # False once the answer was cut short; only complete answers are cached
+    complete = True
+    cerebras = health.breaker("cerebras")
+    cohere_breaker = health.breaker("cohere")
+    # Cohere when a hedge won the race
+    provider = "Cerebras"
 
     # --- ATTEMPT 1: CEREBRAS ---
     try:
         if not cerebras_client: raise Exception("Client not initialized")
+        if not cerebras.allow(): raise CircuitOpen("circuit open")
         
-        completion = cerebras_client.chat.completions.create(
-            model="llama-3.3-70b",
-            messages=[{"role": "system", "content": System + f"\n{RealtimeInformation()}"}] + messages,
-            max_tokens=512,
-            temperature=0.7,
-            top_p=0.95,
-            stream=True
-        )
+        request_start = time.time()
+        first_token = None
+        if hedger.enabled and cohere_client:
+            # Cohere also gets the request if Cerebras is slow to start
+            deltas = hedger.race(("Cerebras", lambda stop: CerebrasDeltas(preamble, history, ctx, stop)),
+                                 ("Cohere", lambda stop: CohereDeltas(Query, preamble, history, ctx, stop)),
+                                 hedger.delay("chatbot"), ctx, site="chatbot")
+            provider = deltas.provider
+            for name, error in deltas.errors.items():
+                health.breaker(name.lower()).failure(error)
+        else:
+            deltas = CerebrasDeltas(preamble, history, ctx)
 
-        for chunk in completion:
-            if chunk.choices[0].delta.content:
-                Answer += chunk.choices[0].delta.content
+        for delta in deltas:
+            if ctx and ctx.cancelled:
+                deltas.close()
+                return ""
+            if ctx and ctx.expired:
+                # Out of budget: keep what has streamed so far
+                deltas.close()
+                print(f"⏱️ {provider} stream cut short at the query deadline")
+                complete = False
+                break
+            if first_token is None:
+                first_token = time.time()
+            if progress is not None:
+                progress["chunks"] = progress.get("chunks", 0) + 1
+            Answer += delta
+            if stream is not None:
+                stream.feed(delta.replace("</s>", ""))
         
-        used_provider = "Cerebras"
+        if ctx and ctx.cancelled:
+            # Cancelled after the last delta: nothing to save
+            return ""
+        if not Answer and ctx and ctx.expired:
+            return TimeoutAnswer
+        if first_token is None:
+            raise Exception("empty answer")
+        used_provider = provider
+        health.breaker(provider.lower()).success(first_token - request_start)
+        if provider == "Cerebras":
+            hedger.observe("chatbot", first_token - request_start)
+        if ctx:
+            name = provider.lower()
+            tracer.record(ctx.trace_id, f"llm.{name}.ttft", request_start, first_token)
+            tracer.record(ctx.trace_id, f"llm.{name}.stream", request_start, time.time())
 
     except Exception as e1:
-        print(f"❌ Cerebras Failed: {e1}")
-        print("🔄 Switching to Fallback (Cohere)...")
+        # Both providers' errors when a hedged race failed
+        failures = getattr(e1, "hedge_errors", None) or {provider: e1}
+        if isinstance(e1, CircuitOpen):
+            print("⏭️ Cerebras circuit open")
+        else:
+            for name, error in failures.items():
+                print(f"❌ {name} Failed: {error}")
+                health.breaker(name.lower()).failure(error)
+        if stream is not None and stream.started:
+            # Part of the answer is already being spoken; finish with what streamed
+            print(f"⚠️ Keeping the partial {provider} answer")
+            used_provider = provider
+            complete = False
+        elif "Cohere" in failures:
+            # The hedge already asked Cohere; don't ask it again
+            if ctx and ctx.cancelled:
+                return ""
+            if ctx and ctx.expired:
+                return TimeoutAnswer
+            return FailureAnswer
+        else:
+            print("🔄 Switching to Fallback (Cohere)...")
         
-        # --- ATTEMPT 2: COHERE (FALLBACK) ---
-        try:
-            if not cohere_client:
-                # Re-init if needed
-                import cohere
-                cohere_client = cohere.Client(api_key=CohereAPIKey)
-
-            # Convert format for Cohere
-            chat_history = []
-            for msg in messages[:-1]: # Exclude current query
-                if msg["role"] == "user":
-                    chat_history.append({"role": "USER", "message": msg["content"]})
-                elif msg["role"] == "assistant":
-                    chat_history.append({"role": "CHATBOT", "message": msg["content"]})
-
-            response = cohere_client.chat(
-                model="command-r-plus-08-2024",
-                message=Query,
-                chat_history=chat_history,
-                preamble=System + f"\n{RealtimeInformation()}",
-                temperature=0.7
-            )
-            Answer = response.text
-            used_provider = "Cohere"
-
-        except Exception as e2:
-            print(f"❌ Cohere Failed: {e2}")
-            return "I apologize, but I'm having trouble connecting to the servers right now. Please check your internet or API keys."
+            # --- ATTEMPT 2: COHERE (FALLBACK) ---
+            try:
+                if not cohere_client:
+                    # Re-init if needed
+                    cohere_client = CohereClient()
+
+                if ctx and ctx.cancelled:
+                    return ""
+                if ctx and ctx.expired:
+                    return TimeoutAnswer
+
+                request_start = time.time()
+                response = cohere_client.chat(
+                    model="command-r-plus-08-2024",
+                    message=Query,
+                    chat_history=CohereHistory(history),
+                    preamble=preamble,
+                    temperature=0.7,
+                    request_options={"timeout_in_seconds": RemainingBudget(ctx, CohereTimeout)}
+                )
+                Answer = response.text
+                used_provider = "Cohere"
+                cohere_breaker.success(time.time() - request_start)
+                if stream is not None:
+                    stream.feed(Answer)
+                if progress is not None:
+                    # Not streamed; count words as an estimate of tokens
+                    progress["chunks"] = progress.get("chunks", 0) + len(Answer.split())
+                if ctx:
+                    tracer.record(ctx.trace_id, "llm.cohere", request_start, time.time())
+
+                if ctx and ctx.cancelled:
+                    return ""
+
+            except Exception as e2:
+                print(f"❌ Cohere Failed: {e2}")
+                cohere_breaker.failure(e2)
+                if ctx and ctx.expired:
+                    return TimeoutAnswer
+                return FailureAnswer
 
     # --- FINAL PROCESSING ---
+    if ctx and ctx.cancelled:
+        return ""
     Answer = Answer.replace("</s>", "").strip()
     Answer = Answer.replace("P.R.I.S.M", "Prism").replace("PRISM", "Prism")
     
     # Save History
-    messages.append({"role": "assistant", "content": Answer})
-    if len(messages) > 10: messages = messages[-10:]
-    
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump(messages, f, indent=2)
+    if save:
+        SaveExchange(Query, Answer)
 
-    return AnswerModifier(Answer)
+    Answer = AnswerModifier(Answer)
+    # Only answers the conversation keeps are cached; an unsaved answer is
+    # cached by whoever commits it (see progress["complete"])
+    if complete and save:
+        answers.put(Query, Answer)
+    if progress is not None:
+        progress["complete"] = complete
+    return Answer
 
 if __name__ == "__main__":
     print("Prism Chat System (with Fallback)")
@@ -0,0 +1,154 @@
+"""
+Per-provider circuit breakers for the LLM fallback chain.
+
+Each provider keeps a rolling window of its last calls: whether they failed
+and how long the first token took. When too many recent calls failed (or
+were too slow), the breaker opens and ChatBot goes straight to the next
+provider instead of waiting for this one to fail again; the cost of an
+outage is paid once, not on every turn. After the cool-down one call is let
+through as a probe (half-open): success closes the breaker, failure opens
+it for another cool-down.
+
+    breaker = health.breaker("cerebras")
+    if breaker.allow():
+        ...
+        breaker.success(first_token_seconds)   # or breaker.failure(error)
+"""
+
+import time
+import threading
+from collections import deque
+from dotenv import dotenv_values
+from Backend.Tracer import Percentile
+
+env_vars = dotenv_values(".env")
+# Calls remembered per provider
+BreakerWindow = int(env_vars.get("BreakerWindow", "20"))
+# Open when at least this share of the window failed...
+BreakerErrorRate = float(env_vars.get("BreakerErrorRate", "0.5"))
+# ...or was slower than BreakerSlowCall seconds to the first token
+BreakerSlowRate = float(env_vars.get("BreakerSlowRate", "0.8"))
+BreakerSlowCall = float(env_vars.get("BreakerSlowCall", "10"))
+# Calls needed in the window before the rates count
+BreakerMinCalls = int(env_vars.get("BreakerMinCalls", "4"))
+# Seconds an open breaker waits before letting a probe through
+BreakerCooldown = float(env_vars.get("BreakerCooldown", "30"))
+
+class CircuitOpen(Exception):
+    """The provider's breaker is open; the call was not made"""
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+class CircuitBreaker:
+    def __init__(self, name, window=BreakerWindow, error_rate=BreakerErrorRate, slow_rate=BreakerSlowRate,
+                 slow_call=BreakerSlowCall, min_calls=BreakerMinCalls, cooldown=BreakerCooldown):
+        self.name = name
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_call = slow_call
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        # (failed, latency) per call, latency None for failures
+        self.calls = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_at = None
+        self.counts = {"calls": 0, "failures": 0, "skipped": 0, "opened": 0}
+
+    def allow(self):
+        """Whether a call may go to this provider now (a half-open breaker lets one probe through)"""
+        with self.lock:
+            now = time.time()
+            if self.state == OPEN and now - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self.probe_at = None
+            if self.state == HALF_OPEN:
+                # One probe at a time; a probe that never reported back is replaced after a cool-down
+                if self.probe_at is None or now - self.probe_at >= self.cooldown:
+                    self.probe_at = now
+                    return True
+            elif self.state == CLOSED:
+                return True
+            self.counts["skipped"] += 1
+            return False
+
+    def success(self, latency=None):
+        """Record a call that produced content; latency is its time to first token in seconds"""
+        with self.lock:
+            self.counts["calls"] += 1
+            if self.state == HALF_OPEN:
+                self.transition(CLOSED, "probe succeeded")
+                self.calls.clear()
+            self.calls.append((False, latency))
+            self.evaluate()
+
+    def failure(self, error=None):
+        with self.lock:
+            self.counts["calls"] += 1
+            self.counts["failures"] += 1
+            self.calls.append((True, None))
+            if self.state == HALF_OPEN:
+                self.transition(OPEN, f"probe failed: {error}")
+            else:
+                self.evaluate()
+
+    def evaluate(self):
+        """Open a closed breaker whose window is over the error or slow-call rate (lock held)"""
+        if self.state != CLOSED or len(self.calls) < self.min_calls:
+            return
+        failed = sum(1 for f, _ in self.calls if f)
+        slow = sum(1 for f, latency in self.calls if not f and latency is not None and latency > self.slow_call)
+        if failed / len(self.calls) >= self.error_rate:
+            self.transition(OPEN, f"{failed}/{len(self.calls)} recent calls failed")
+        elif slow / len(self.calls) >= self.slow_rate:
+            self.transition(OPEN, f"{slow}/{len(self.calls)} recent calls slower than {self.slow_call:g}s")
+
+    def transition(self, state, reason):
+        if state == OPEN:
+            self.opened_at = time.time()
+            self.counts["opened"] += 1
+        self.state = state
+        self.probe_at = None
+        print(f"[BREAKER]: {self.name} {state} ({reason})")
+
+    def latency(self, p):
+        """Percentile of recent first-token latencies in seconds (None before any success)"""
+        with self.lock:
+            latencies = [latency for failed, latency in self.calls if not failed and latency is not None]
+        return Percentile(latencies, p) if latencies else None
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counts)
+            stats["state"] = self.state
+            window = list(self.calls)
+        stats["error_rate"] = sum(1 for f, _ in window if f) / len(window) if window else 0.0
+        return stats
+
+class ProviderHealth:
+    """The breakers of every provider, created on first use"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.breakers = {}
+
+    def breaker(self, name):
+        with self.lock:
+            if name not in self.breakers:
+                self.breakers[name] = CircuitBreaker(name)
+            return self.breakers[name]
+
+    def stats(self):
+        with self.lock:
+            breakers = dict(self.breakers)
+        return {name: breaker.stats() for name, breaker in sorted(breakers.items())}
+
+    def report(self):
+        for name, stats in self.stats().items():
+            print(f"[BREAKER]: {name} {stats['state']}, {stats['failures']}/{stats['calls']} calls failed, "
+                  f"opened {stats['opened']}x, {stats['skipped']} calls skipped")
+
+health = ProviderHealth()
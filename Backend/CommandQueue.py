@@ -0,0 +1,171 @@
+import heapq
+import itertools
+import string
+import threading
+import time
+from dotenv import dotenv_values
+from Backend.QueryContext import QueryContext
+
+env_vars = dotenv_values(".env")
+CommandQueueSize = int(env_vars.get("CommandQueueSize", "8"))
+# Most pending commands decided together in one model call
+DecisionBatchSize = int(env_vars.get("DecisionBatchSize", "4"))
+
+# Priority lanes, lower runs first
+PRIORITY_CONTROL = 0
+PRIORITY_NORMAL = 1
+
+# Control utterances bypass the decision model and preempt the running query.
+# Value is the task to run afterwards (None = just stop).
+CONTROL_COMMANDS = {
+    "stop": None,
+    "cancel": None,
+    "never mind": None,
+    "mute": "system mute",
+    "exit": "exit",
+    "quit": "exit",
+    "bye": "exit",
+    "goodbye": "exit",
+}
+
+def NormalizeCommand(text):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = text.lower().translate(str.maketrans("", "", string.punctuation))
+    return " ".join(text.split())
+
+class Command:
+    def __init__(self, text, priority, seq, source):
+        self.text = text
+        self.key = NormalizeCommand(text)
+        self.priority = priority
+        self.seq = seq
+        self.source = source
+        self.enqueued_at = time.time()
+        # When the user started speaking (voice) or typing was submitted
+        self.started = self.enqueued_at
+        self.finished_at = None
+        # Decision made ahead of time when queued commands are decided together
+        self.tasks = None
+        self.ctx = QueryContext(text)
+        self.done = threading.Event()
+
+    @property
+    def control_task(self):
+        return CONTROL_COMMANDS.get(self.key)
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def __repr__(self):
+        return f"Command({self.text!r}, priority={self.priority})"
+
+class CommandQueue:
+    """
+    Bounded priority queue of pending commands.
+
+    - Control commands jump ahead of normal ones and fire on_control so the
+      caller can preempt whatever is running.
+    - A command identical to one already pending is coalesced into it.
+    - When full, normal commands are rejected (put returns None) instead of
+      being silently lost; control commands evict the newest normal one.
+    """
+
+    def __init__(self, maxsize=CommandQueueSize, on_control=None):
+        self.maxsize = maxsize
+        self.on_control = on_control
+        self.heap = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.stats = {"queued": 0, "coalesced": 0, "rejected": 0, "evicted": 0}
+
+    def put(self, text, source="voice"):
+        """Queue a command. Returns the Command, or None if rejected."""
+        key = NormalizeCommand(text)
+        priority = PRIORITY_CONTROL if key in CONTROL_COMMANDS else PRIORITY_NORMAL
+
+        with self.condition:
+            for pending in self.heap:
+                if pending.key == key:
+                    self.stats["coalesced"] += 1
+                    return pending
+
+            if len(self.heap) >= self.maxsize:
+                normal = [c for c in self.heap if c.priority == PRIORITY_NORMAL]
+                if priority == PRIORITY_NORMAL or not normal:
+                    self.stats["rejected"] += 1
+                    return None
+                newest = max(normal, key=lambda c: c.seq)
+                self.heap.remove(newest)
+                heapq.heapify(self.heap)
+                self.stats["evicted"] += 1
+                print(f"[QUEUE]: Dropped '{newest.text}' to make room for '{text}'")
+
+            command = Command(text, priority, next(self.counter), source)
+            heapq.heappush(self.heap, command)
+            self.stats["queued"] += 1
+            self.condition.notify()
+
+        if priority == PRIORITY_CONTROL and self.on_control:
+            self.on_control(command)
+        return command
+
+    def get(self, timeout=None):
+        """Pop the highest-priority command, or None on timeout"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.heap, timeout):
+                return None
+            return heapq.heappop(self.heap)
+
+    def get_batch(self, limit=DecisionBatchSize, timeout=None):
+        """
+        Pop the highest-priority command plus, if it is a normal one, up to
+        limit - 1 further normal commands already waiting. Control commands
+        always come alone. Returns [] on timeout.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.heap, timeout):
+                return []
+            batch = [heapq.heappop(self.heap)]
+            while (batch[0].priority == PRIORITY_NORMAL and self.heap and len(batch) < limit
+                   and self.heap[0].priority == PRIORITY_NORMAL):
+                batch.append(heapq.heappop(self.heap))
+            return batch
+
+    def requeue(self, commands):
+        """
+        Put popped commands back in their original order (a control command
+        arrived meanwhile). The bound still holds: past maxsize the newest
+        normal commands are evicted, as in put. Returns the evicted commands.
+        """
+        evicted = []
+        with self.condition:
+            for command in commands:
+                heapq.heappush(self.heap, command)
+            while len(self.heap) > self.maxsize:
+                normal = [c for c in self.heap if c.priority == PRIORITY_NORMAL]
+                if not normal:
+                    break
+                newest = max(normal, key=lambda c: c.seq)
+                self.heap.remove(newest)
+                evicted.append(newest)
+                self.stats["evicted"] += 1
+                print(f"[QUEUE]: Dropped '{newest.text}' to stay within {self.maxsize} pending commands")
+            heapq.heapify(self.heap)
+            self.condition.notify()
+        return evicted
+
+    def control_pending(self):
+        with self.condition:
+            return bool(self.heap) and self.heap[0].priority == PRIORITY_CONTROL
+
+    def clear(self, priority=PRIORITY_NORMAL):
+        """Drop every pending command of the given lane"""
+        with self.condition:
+            dropped = [c for c in self.heap if c.priority == priority]
+            self.heap = [c for c in self.heap if c.priority != priority]
+            heapq.heapify(self.heap)
+        return dropped
+
+    def __len__(self):
+        with self.condition:
+            return len(self.heap)
@@ -0,0 +1,29 @@
+import os
+import re
+import subprocess
+from Backend.Chatbot import ChatBot
+
+CONTENT_DIR = os.path.join("Data", "Content")
+
+def ContentFilename(topic):
+    slug = re.sub(r"[^a-z0-9]+", "_", topic.lower()).strip("_")[:60]
+    return os.path.join(CONTENT_DIR, f"{slug or 'content'}.txt")
+
+def WriteContent(topic, ctx=None):
+    """Write an email/code/blog on a topic, save it under Data/Content and open it"""
+    content = ChatBot(f"Write {topic}. Reply with the content only.", ctx)
+    if not content:
+        return ""
+
+    os.makedirs(CONTENT_DIR, exist_ok=True)
+    path = ContentFilename(topic)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+    if os.name == 'nt':
+        try:
+            subprocess.Popen(["notepad.exe", path])
+        except Exception as e:
+            print(f"[CONTENT]: Could not open {path}: {e}")
+
+    return f"I've written {topic} and saved it to {path}."
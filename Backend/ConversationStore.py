@@ -0,0 +1,147 @@
+"""
+Append-only conversation store shared by ChatBot and RealtimeSearchEngine.
+
+Turns are appended to a SQLite database in WAL mode (Data/Conversation.db),
+so saving an exchange is one small transaction instead of rereading and
+rewriting the whole chat log. The most recent turns are also kept in
+memory; building a prompt never touches the disk. Indexes that need every
+turn (see Memory) follow() the store: they read it once and are then
+handed each appended batch. A lock serializes writers in this process and
+WAL lets other processes read meanwhile.
+
+An existing Data/ChatLog.json is imported once on first open. With
+ConversationHistory=0 the store lives in memory only and nothing is
+written to disk.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import deque
+from dotenv import dotenv_values
+
+env_vars = dotenv_values(".env")
+# Turns kept in memory for prompt building
+ConversationTail = int(env_vars.get("ConversationTail", "50"))
+ConversationHistory = env_vars.get("ConversationHistory", "1") == "1"
+# SQLite's in-memory database when history must not be kept
+CONVERSATION_DB = os.path.join("Data", "Conversation.db") if ConversationHistory else ":memory:"
+# Written as r"Data\ChatLog.json" by earlier versions, which is a plain file name outside Windows
+LEGACY_CHATLOGS = [os.path.join("Data", "ChatLog.json"), "Data\\ChatLog.json"]
+
+class ConversationStore:
+    def __init__(self, path=CONVERSATION_DB, tail_size=ConversationTail):
+        self.path = path
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=tail_size)
+        self.listeners = []
+        self.db = None
+
+    def open(self):
+        """Connect, create the schema, import a legacy ChatLog.json and load the tail"""
+        with self.lock:
+            if self.db is not None:
+                return self
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS turns ("
+                       "id INTEGER PRIMARY KEY, role TEXT NOT NULL, content TEXT NOT NULL, created REAL NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.db = db
+            if self.path != ":memory:":
+                self.import_legacy()
+            rows = db.execute("SELECT id, role, content, created FROM turns ORDER BY id DESC LIMIT ?",
+                              (self.recent.maxlen,)).fetchall()
+            self.recent.extend(self.row(r) for r in reversed(rows))
+        return self
+
+    @staticmethod
+    def row(row):
+        return {"id": row[0], "role": row[1], "content": row[2], "created": row[3]}
+
+    def import_legacy(self):
+        if self.db.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+            return
+        turns = []
+        for path in LEGACY_CHATLOGS:
+            try:
+                with open(path, "r") as f:
+                    turns = json.load(f)
+                break
+            except (FileNotFoundError, ValueError):
+                continue
+        now = time.time()
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany("INSERT INTO turns (role, content, created) VALUES (?, ?, ?)",
+                                [(t["role"], t["content"], now) for t in turns
+                                 if isinstance(t, dict) and "role" in t and "content" in t])
+            self.db.execute("INSERT INTO meta (key, value) VALUES ('legacy_imported', ?)", (str(len(turns)),))
+
+    def append(self, *turns):
+        """
+        Append (role, content) turns in one transaction: a question and its
+        answer are stored together or not at all. Returns the stored turns.
+        """
+        self.open()
+        now = time.time()
+        with self.lock:
+            with self.db:
+                self.db.execute("BEGIN")
+                stored = []
+                for role, content in turns:
+                    cursor = self.db.execute("INSERT INTO turns (role, content, created) VALUES (?, ?, ?)",
+                                             (role, content, now))
+                    stored.append({"id": cursor.lastrowid, "role": role, "content": content, "created": now})
+            self.recent.extend(stored)
+            # Under the lock, so listeners see batches in id order
+            for listener in self.listeners:
+                listener(stored)
+        return stored
+
+    def append_exchange(self, query, answer):
+        return self.append(("user", query), ("assistant", answer))
+
+    def tail(self, count):
+        """The last count turns as chat messages ({'role', 'content'}), oldest first"""
+        self.open()
+        with self.lock:
+            turns = list(self.recent)[-count:] if count else []
+        return [{"role": t["role"], "content": t["content"]} for t in turns]
+
+    def turns(self, after_id=0):
+        """Every stored turn after an id, oldest first (reads the database)"""
+        self.open()
+        with self.lock:
+            rows = self.db.execute("SELECT id, role, content, created FROM turns WHERE id > ? ORDER BY id",
+                                   (after_id,)).fetchall()
+        return [self.row(r) for r in rows]
+
+    def follow(self, listener):
+        """
+        Call listener(turns) with every stored turn now and with each appended
+        batch from then on. Listeners run under the store's lock and must not
+        call back into the store.
+        """
+        self.open()
+        with self.lock:
+            rows = self.db.execute("SELECT id, role, content, created FROM turns ORDER BY id").fetchall()
+            listener([self.row(r) for r in rows])
+            self.listeners.append(listener)
+
+    def __len__(self):
+        self.open()
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
+
+store = ConversationStore()
@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from dotenv import dotenv_values
+from Backend.CommandQueue import NormalizeCommand
+from Backend.IntentMatcher import Normalize
+
+env_vars = dotenv_values(".env")
+DecisionCacheSize = int(env_vars.get("DecisionCacheSize", "512"))
+DecisionCacheTTL = float(env_vars.get("DecisionCacheTTL", str(7 * 24 * 3600)))
+DECISION_CACHE_FILE = os.path.join("Data", "DecisionCache.json")
+
+def CacheKey(prompt):
+    """'Hey Prism, what's the weather?' and 'whats the weather' share a key"""
+    return NormalizeCommand(Normalize(prompt))
+
+class DecisionCache:
+    """
+    LRU + TTL cache of decision-model task lists, persisted to
+    Data/DecisionCache.json so repeated commands skip the network after a
+    restart too. Entries are kept least recently used first.
+    """
+
+    def __init__(self, path=DECISION_CACHE_FILE, maxsize=DecisionCacheSize, ttl=DecisionCacheTTL):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats_counts = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        now = time.time()
+        for key, entry in saved:
+            if now - entry["stored"] < self.ttl:
+                self.entries[key] = entry
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        """Atomic rewrite, so a crash mid-save never leaves a truncated cache"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp = self.path + ".tmp"
+        with open(temp, "w") as f:
+            json.dump(list(self.entries.items()), f)
+        os.replace(temp, self.path)
+
+    def get(self, prompt):
+        """Cached tasks for a prompt, or None"""
+        key = CacheKey(prompt)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats_counts["misses"] += 1
+                return None
+            if time.time() - entry["stored"] >= self.ttl:
+                del self.entries[key]
+                self.stats_counts["expired"] += 1
+                self.stats_counts["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats_counts["hits"] += 1
+            return list(entry["tasks"])
+
+    def contains(self, prompt):
+        """Whether get() would hit, without touching the statistics or LRU order"""
+        with self.lock:
+            entry = self.entries.get(CacheKey(prompt))
+            return entry is not None and time.time() - entry["stored"] < self.ttl
+
+    def put(self, prompt, tasks):
+        key = CacheKey(prompt)
+        if not key or not tasks:
+            return
+        with self.lock:
+            self.entries[key] = {"tasks": list(tasks), "stored": time.time()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.stats_counts["evicted"] += 1
+            try:
+                self.save()
+            except OSError as e:
+                print(f"[DECISION CACHE]: Save failed: {e}")
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.save()
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.stats_counts, size=len(self.entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def report(self):
+        stats = self.stats()
+        print(f"[DECISION CACHE]: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+              f"{stats['size']} entries, {stats['expired']} expired, {stats['evicted']} evicted")
+
+cache = DecisionCache()
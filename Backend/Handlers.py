@@ -0,0 +1,153 @@
+"""
+Capability registry for decision tasks.
+
+Every capability registers the task prefix it answers to ("open",
+"system volume up", ...) with its scheduling metadata. Dispatch walks a
+word-level prefix trie and picks the longest registered prefix, so
+"google search cats" reaches "google search" rather than a shorter match.
+
+Plugins are plain modules in Plugins/ that call registry.register:
+
+    from Backend.Handlers import registry, PRIORITY_FAST
+
+    @registry.register("weather", description="'weather (city)' for forecasts",
+                       timeout=10, priority=PRIORITY_FAST)
+    def Weather(city):
+        ...
+"""
+
+import os
+import importlib.util
+from Backend.TaskExecutor import TaskJob
+from Backend.SpeechStream import SentenceStream, StreamSpeech
+
+# Scheduling priority: lower runs (and is spoken) first when reordering is allowed
+PRIORITY_INSTANT = 0
+PRIORITY_FAST = 1
+PRIORITY_SLOW = 2
+
+def TextArgument(argument, query):
+    """The task text after the prefix; the task is skipped when it is empty"""
+    return (argument,) if argument else None
+
+def QueryArgument(argument, query):
+    """The task text after the prefix, or the whole utterance if the model left it empty"""
+    return (argument or query,)
+
+def NoArguments(argument, query):
+    return ()
+
+def StepsArgument(argument, query):
+    """An optional repeat count, e.g. 'system volume up 3'"""
+    return (int(argument),) if argument.isdigit() and int(argument) > 0 else ()
+
+class Handler:
+    def __init__(self, prefix, func, parser=TextArgument, timeout=None, parallel_safe=True,
+                 lane=None, priority=PRIORITY_FAST, accepts_ctx=False, streams=False, name=None, description=None):
+        self.prefix = prefix
+        self.func = func
+        self.parser = parser
+        self.timeout = timeout
+        self.parallel_safe = parallel_safe
+        self.lane = lane
+        self.priority = priority
+        self.accepts_ctx = accepts_ctx
+        # Takes a stream= SentenceStream to feed the answer into as it is generated
+        self.streams = streams
+        self.name = name or prefix
+        self.description = description
+
+    def __repr__(self):
+        return f"Handler({self.prefix!r})"
+
+class PrefixTrie:
+    """Word-level trie from task prefixes to handlers"""
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, words, value):
+        node = self.root
+        for word in words:
+            node = node.setdefault(word, {})
+        node[None] = value
+
+    def longest_match(self, words):
+        """Return (value, words consumed) for the longest stored prefix of words"""
+        node, match = self.root, (None, 0)
+        for depth, word in enumerate(words, 1):
+            node = node.get(word)
+            if node is None:
+                break
+            if None in node:
+                match = (node[None], depth)
+        return match
+
+class HandlerRegistry:
+    def __init__(self):
+        self.trie = PrefixTrie()
+        self.handlers = {}
+
+    def register(self, prefix, func=None, **metadata):
+        """Register func for a task prefix. Without func, works as a decorator."""
+        if func is None:
+            return lambda f: self.register(prefix, f, **metadata) or f
+
+        handler = Handler(prefix, func, **metadata)
+        self.handlers[prefix] = handler
+        self.trie.insert(prefix.lower().split(), handler)
+        return handler
+
+    def dispatch(self, task):
+        """Return (handler, argument text) for a task, or (None, None)"""
+        words = task.strip().split()
+        handler, consumed = self.trie.longest_match([w.lower() for w in words])
+        if handler is None:
+            return None, None
+        return handler, " ".join(words[consumed:])
+
+    def job(self, task, query, ctx=None):
+        """Turn one decision task into a TaskJob carrying its handler's metadata"""
+        handler, argument = self.dispatch(task)
+        if handler is None:
+            print(f"[UNHANDLED]: {task}")
+            return None
+        args = handler.parser(argument, query)
+        if args is None:
+            return None
+        kwargs = {"ctx": ctx} if handler.accepts_ctx else {}
+        stream = None
+        if handler.streams and StreamSpeech:
+            stream = kwargs["stream"] = SentenceStream(ctx)
+        return TaskJob(handler.name, handler.func, args, kwargs, parallel_safe=handler.parallel_safe,
+                       lane=handler.lane, timeout=handler.timeout, priority=handler.priority, stream=stream)
+
+    def prefixes(self):
+        return sorted(self.handlers)
+
+    def descriptions(self):
+        """Decision-model instructions contributed by capabilities"""
+        return [f"-> Respond with {h.description}." for h in self.handlers.values() if h.description]
+
+    def load_plugins(self, directory="Plugins"):
+        """Import every module in the plugin directory so it can register itself"""
+        if not os.path.isdir(directory):
+            return []
+        loaded = []
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".py") or filename.startswith("_"):
+                continue
+            name = f"Plugins.{filename[:-3]}"
+            try:
+                spec = importlib.util.spec_from_file_location(name, os.path.join(directory, filename))
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                loaded.append(name)
+            except Exception as e:
+                print(f"[PLUGINS]: Failed to load {filename}: {e}")
+        if loaded:
+            print(f"[PLUGINS]: Loaded {', '.join(loaded)}")
+        return loaded
+
+# Shared registry; built-in capabilities live in Backend/Capabilities.py
+registry = HandlerRegistry()
@@ -0,0 +1,235 @@
+"""
+Hedged LLM requests for tail latency.
+
+With hedging on, ChatBot starts the Cerebras stream and waits for its first
+token. If none has arrived after the hedge delay (a percentile of recent
+first-token latencies at that call site), the same request also goes to
+Cohere. Whichever stream produces content first is used and the other is
+stopped. A token-bucket budget bounds how often hedges fire, so an overall
+slowdown can't double the request volume.
+
+Latencies are kept per call site, so ChatBot's short answers aren't mixed
+with RealtimeSearchEngine's long, search-heavy prompts. When the backup
+wins, the stopped primary's elapsed time is recorded as its sample: its
+real first token was at least that late, and leaving it out would let the
+percentile drift down and hedges fire ever more often.
+"""
+
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import dotenv_values
+from Backend.Tracer import Percentile
+
+env_vars = dotenv_values(".env")
+# Off by default: a hedge is a second paid request
+HedgeRequests = env_vars.get("HedgeRequests", "0") == "1"
+# Hedge after this percentile of recent first-token latencies...
+HedgePercentile = float(env_vars.get("HedgePercentile", "95"))
+# ...but never sooner than HedgeMinDelay, and after HedgeDelay before there is any history
+HedgeMinDelay = float(env_vars.get("HedgeMinDelay", "0.3"))
+HedgeDelay = float(env_vars.get("HedgeDelay", "1.5"))
+# Hedges earned per request (0.1 = at most about one request in ten), and how many can be saved up
+HedgeBudget = float(env_vars.get("HedgeBudget", "0.1"))
+HedgeBurst = float(env_vars.get("HedgeBurst", "2"))
+# First-token latencies remembered per call site
+HedgeWindow = int(env_vars.get("HedgeWindow", "50"))
+
+# Queue item kinds
+CONTENT, END, ERROR = "content", "end", "error"
+
+class HedgedStream:
+    """
+    Text deltas of the winning provider. The first delta has already been
+    received; the rest are read as the winner streams them.
+    """
+
+    def __init__(self, race, provider, first):
+        self.race = race
+        self.provider = provider
+        self.first = first
+        # Providers that failed during the race (name -> exception)
+        self.errors = {}
+
+    def __iter__(self):
+        if self.first is None:
+            # Nobody had any content
+            return
+        yield self.first
+        while True:
+            name, kind, value = self.race.get()
+            if name is None:
+                return
+            if name != self.provider:
+                continue
+            if kind == ERROR:
+                raise value
+            if kind == END:
+                return
+            yield value
+
+    def close(self):
+        self.race.stop()
+
+class Race:
+    """Streams of one hedged request, read through a single queue"""
+
+    def __init__(self, hedger, ctx=None):
+        self.hedger = hedger
+        self.ctx = ctx
+        self.items = queue.Queue()
+        self.stops = {}
+        self.running = set()
+        if ctx:
+            ctx.on_cancel(lambda: self.items.put((None, END, None)))
+
+    def start(self, name, start):
+        stop = threading.Event()
+        self.stops[name] = stop
+        self.running.add(name)
+        self.hedger.pool.submit(self.run, name, start, stop)
+
+    def run(self, name, start, stop):
+        try:
+            for delta in start(stop):
+                if stop.is_set():
+                    break
+                self.items.put((name, CONTENT, delta))
+            self.items.put((name, END, None))
+        except Exception as e:
+            self.items.put((name, ERROR, e))
+
+    def get(self, timeout=None):
+        """Next (name, kind, value); (None, END, None) on cancellation or when the budget runs out"""
+        if self.ctx:
+            timeout = self.ctx.wait_limit(timeout)
+        try:
+            item = self.items.get(timeout=timeout)
+        except queue.Empty:
+            return None, END, None
+        if self.ctx and self.ctx.cancelled:
+            return None, END, None
+        return item
+
+    def stop(self, keep=None):
+        for name, stop in self.stops.items():
+            if name != keep:
+                stop.set()
+
+class Hedger:
+    def __init__(self, enabled=HedgeRequests, percentile=HedgePercentile, min_delay=HedgeMinDelay,
+                 default_delay=HedgeDelay, budget=HedgeBudget, burst=HedgeBurst, window=HedgeWindow):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.budget = budget
+        self.burst = burst
+        self.window = window
+        self.tokens = 1.0
+        # call site -> recent first-token latencies of its primary
+        self.samples = {}
+        # Losers keep a thread until their stream notices the stop
+        self.pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="prism-hedge")
+        self.lock = threading.Lock()
+        # wins: races each provider won once both were running
+        self.counts = {"requests": 0, "hedged": 0, "denied": 0, "wins": {}}
+
+    def observe(self, site, latency):
+        """Record the primary's time to first token (or to being stopped) at a call site"""
+        with self.lock:
+            self.samples.setdefault(site, deque(maxlen=self.window)).append(latency)
+
+    def delay(self, site):
+        """Seconds to wait for the primary's first token, from its recent latencies at site"""
+        with self.lock:
+            samples = list(self.samples.get(site, ()))
+        latency = Percentile(samples, self.percentile) if samples else self.default_delay
+        return max(latency, self.min_delay)
+
+    def spend(self):
+        """Take a hedge from the budget if one is left"""
+        with self.lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.counts["hedged"] += 1
+                return True
+            self.counts["denied"] += 1
+            return False
+
+    def race(self, primary, backup, delay, ctx=None, site=None):
+        """
+        Start primary and, if it has no content after delay seconds (or fails
+        first), backup. primary and backup are (name, start) pairs where
+        start(stop) returns an iterator of text deltas and should end soon
+        after the stop event is set. Returns a HedgedStream of the first
+        provider with content; raises the primary's error if neither had any,
+        with every provider's error in its hedge_errors. When the backup wins, the primary's elapsed time is observed for site.
+        """
+        with self.lock:
+            self.counts["requests"] += 1
+            self.tokens = min(self.tokens + self.budget, self.burst)
+
+        race = Race(self, ctx)
+        started = time.time()
+        race.start(*primary)
+        errors = {}
+        hedged = False
+
+        while race.running:
+            name, kind, value = race.get(None if hedged else delay)
+            if name is None:
+                if kind == END and (ctx is None or not (ctx.cancelled or ctx.expired)) and not hedged:
+                    # No first token within the delay: hedge if the budget allows
+                    hedged = True
+                    if self.spend():
+                        print(f"[HEDGE]: No first token from {primary[0]} after {delay:.2f}s, also asking {backup[0]}")
+                        race.start(*backup)
+                    continue
+                # Cancelled or out of time
+                race.stop()
+                break
+            if kind == CONTENT:
+                if not value:
+                    continue
+                if site and name != primary[0] and primary[0] in race.running:
+                    # The primary's first token never came; it was at least this late
+                    self.observe(site, time.time() - started)
+                race.stop(keep=name)
+                if len(race.stops) > 1:
+                    with self.lock:
+                        self.counts["wins"][name] = self.counts["wins"].get(name, 0) + 1
+                stream = HedgedStream(race, name, value)
+                stream.errors = errors
+                return stream
+            race.running.discard(name)
+            if kind == ERROR:
+                errors[name] = value
+                print(f"[HEDGE]: {name} failed: {value}")
+            if name == primary[0] and backup[0] not in race.stops:
+                # The primary failed before the delay; the backup is a plain fallback, not a hedge
+                hedged = True
+                race.start(*backup)
+
+        if primary[0] in errors:
+            error = errors[primary[0]]
+            error.hedge_errors = dict(errors)
+            raise error
+        return HedgedStream(race, primary[0], None)
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counts)
+            stats["wins"] = dict(self.counts["wins"])
+        stats["hedge_rate"] = stats["hedged"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+    def report(self):
+        stats = self.stats()
+        wins = ", ".join(f"{name} {count}" for name, count in sorted(stats["wins"].items())) or "none"
+        print(f"[HEDGE]: {stats['hedged']}/{stats['requests']} requests hedged ({stats['hedge_rate']:.0%}), "
+              f"{stats['denied']} over budget, wins: {wins}")
+
+hedger = Hedger()
@@ -0,0 +1,187 @@
+"""
+Shared keep-alive HTTP connections for every backend.
+
+One httpx client per host, each with its own connection limit, keeps
+connections open between requests, so only the first request to a host
+pays for DNS, TCP and TLS. HTTP/2 is used when the h2 package is installed
+(HttpHTTP2=1). The Cerebras and Cohere SDK clients are created once here on
+top of the same pool and shared by ChatBot, RealtimeSearchEngine and the
+decision model.
+
+Connections to the endpoints with configured credentials are opened ahead
+of time: once at startup and again for any host that has been idle long
+enough for its keep-alive connection to close. Re-warming stops once the
+whole session has been idle for HttpWarmIdle seconds and resumes with the
+next request.
+
+    from Backend.HttpPool import pool
+    response = pool.post(url, json=payload, timeout=8)
+"""
+
+import time
+import threading
+import importlib.util
+from urllib.parse import urlsplit
+import httpx
+from dotenv import dotenv_values
+
+env_vars = dotenv_values(".env")
+# Open connections per host
+HttpPerHost = int(env_vars.get("HttpPerHost", "8"))
+# Seconds an unused connection is kept open
+HttpKeepAlive = float(env_vars.get("HttpKeepAlive", "120"))
+HttpHTTP2 = env_vars.get("HttpHTTP2", "1") == "1"
+HttpPrewarm = env_vars.get("HttpPrewarm", "1") == "1"
+# Re-warm a host after this many idle seconds (below HttpKeepAlive and typical server idle timeouts)
+HttpWarmInterval = float(env_vars.get("HttpWarmInterval", "45"))
+HttpWarmTimeout = float(env_vars.get("HttpWarmTimeout", "3"))
+# Stop re-warming after this many seconds without a real request
+HttpWarmIdle = float(env_vars.get("HttpWarmIdle", "600"))
+
+CerebrasAPIKey = env_vars.get("CerebrasAPIKey")
+CohereAPIKey = env_vars.get("CohereAPIKey")
+CerebrasBaseURL = env_vars.get("CerebrasBaseURL")
+CohereBaseURL = env_vars.get("CohereBaseURL")
+
+# Endpoints worth keeping warm: the backends' own settings (with their
+# defaults), only for the services that have credentials configured
+ENDPOINTS = [url for key, url in [
+    ("CerebrasAPIKey", CerebrasBaseURL or "https://api.cerebras.ai"),
+    ("CohereAPIKey", CohereBaseURL or "https://api.cohere.com"),
+    ("SerperAPIKey", env_vars.get("SerperURL", "https://google.serper.dev/search")),
+    ("HuggingFaceAPIKey", env_vars.get("HuggingFaceURL", "https://api-inference.huggingface.co")),
+] if env_vars.get(key)]
+
+def HostKey(url):
+    parts = urlsplit(str(url))
+    return f"{parts.scheme}://{parts.netloc}"
+
+class HttpPool:
+    def __init__(self, per_host=HttpPerHost, keepalive=HttpKeepAlive, http2=HttpHTTP2):
+        self.per_host = per_host
+        self.keepalive = keepalive
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.lock = threading.Lock()
+        self.clients = {}
+        # Last real request per host, and last warm-up
+        self.last_used = {}
+        self.last_warmed = {}
+        self.active = time.time()
+        # Set on the warmer's thread so its HEAD requests don't count as use
+        self.local = threading.local()
+        self.counts = {}
+        self.warmer = None
+        self.stopped = threading.Event()
+
+    def client(self, url):
+        """The shared httpx client for url's host"""
+        host = HostKey(url)
+        with self.lock:
+            client = self.clients.get(host)
+            if client is None:
+                client = httpx.Client(
+                    http2=self.http2,
+                    limits=httpx.Limits(max_connections=self.per_host, max_keepalive_connections=self.per_host,
+                                        keepalive_expiry=self.keepalive),
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                    follow_redirects=True,
+                    event_hooks={"request": [lambda request, host=host: self.touch(host)]})
+                self.clients[host] = client
+                self.counts[host] = {"requests": 0, "warmed": 0}
+            return client
+
+    def touch(self, host):
+        if getattr(self.local, "warming", False):
+            return
+        with self.lock:
+            self.last_used[host] = self.active = time.time()
+            self.counts[host]["requests"] += 1
+
+    def request(self, method, url, **kwargs):
+        return self.client(url).request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def warm(self, urls=ENDPOINTS, idle=0.0):
+        """Open a connection to each endpoint's host neither used nor warmed in the last idle seconds"""
+        now = time.time()
+        self.local.warming = True
+        try:
+            for url in dict.fromkeys(HostKey(u) for u in urls if u):
+                with self.lock:
+                    if now - max(self.last_used.get(url, 0), self.last_warmed.get(url, 0)) < idle:
+                        continue
+                try:
+                    # Any answer will do: the point is the open connection
+                    self.client(url).head(url, timeout=HttpWarmTimeout)
+                    with self.lock:
+                        self.last_warmed[url] = time.time()
+                        self.counts[url]["warmed"] += 1
+                except Exception as e:
+                    print(f"[HTTP POOL]: Could not warm {url}: {e}")
+        finally:
+            self.local.warming = False
+
+    def start_warming(self, urls=ENDPOINTS, interval=HttpWarmInterval, session_idle=HttpWarmIdle):
+        """Warm every endpoint now, then keep idle hosts warm while the session is in use"""
+        if not HttpPrewarm or self.warmer is not None:
+            return
+        self.active = time.time()
+
+        def loop():
+            self.warm(urls)
+            while not self.stopped.wait(interval):
+                with self.lock:
+                    idle = time.time() - self.active
+                if idle < session_idle:
+                    self.warm(urls, idle=interval)
+
+        self.warmer = threading.Thread(target=loop, daemon=True, name="prism-http-warm")
+        self.warmer.start()
+
+    def stats(self):
+        with self.lock:
+            return {host: dict(counts) for host, counts in self.counts.items()}
+
+    def report(self):
+        for host, counts in self.stats().items():
+            print(f"[HTTP POOL]: {host} {counts['requests']} requests, warmed {counts['warmed']}x")
+
+    def close(self):
+        self.stopped.set()
+        with self.lock:
+            clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            client.close()
+
+pool = HttpPool()
+
+# --- Shared SDK clients ---
+sdk_lock = threading.Lock()
+sdk_clients = {}
+
+def CerebrasClient():
+    """The Cerebras SDK client, on the shared pool (None without an API key)"""
+    with sdk_lock:
+        if "cerebras" not in sdk_clients:
+            from cerebras.cloud.sdk import Cerebras
+            sdk_clients["cerebras"] = Cerebras(
+                api_key=CerebrasAPIKey, base_url=CerebrasBaseURL,
+                http_client=pool.client(CerebrasBaseURL or "https://api.cerebras.ai"),
+                # The pool warms connections itself
+                warm_tcp_connection=False) if CerebrasAPIKey else None
+        return sdk_clients["cerebras"]
+
+def CohereClient():
+    """The Cohere SDK client, on the shared pool (None without an API key)"""
+    with sdk_lock:
+        if "cohere" not in sdk_clients:
+            import cohere
+            sdk_clients["cohere"] = cohere.Client(
+                api_key=CohereAPIKey, base_url=CohereBaseURL,
+                httpx_client=pool.client(CohereBaseURL or "https://api.cohere.com")) if CohereAPIKey else None
+        return sdk_clients["cohere"]
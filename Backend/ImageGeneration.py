@@ -1,26 +1,30 @@
-import requests
 import os
+import httpx
+from urllib.parse import quote
 from datetime import datetime
 from dotenv import dotenv_values
+from Backend.QueryContext import RemainingBudget
+from Backend.HttpPool import pool
 
 # Load environment variables
 env_vars = dotenv_values(".env")
 HuggingFaceAPIKey = env_vars.get("HuggingFaceAPIKey")
 
 # API endpoint for Stable Diffusion or similar models
-API_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
+API_URL = env_vars.get("HuggingFaceURL", "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0")
 
 # Ensure Images directory exists
 if not os.path.exists("Images"):
     os.makedirs("Images")
 
-def GenerateImage(prompt, filename=None):
+def GenerateImage(prompt, filename=None, timeout=60):
     """
     Generate an image using Hugging Face's Inference API
     
     Args:
         prompt (str): The text prompt for image generation
         filename (str): Optional custom filename
+        timeout (float): Request timeout in seconds
     
     Returns:
         str: Status message with file path or error
@@ -44,7 +48,7 @@ def GenerateImage(prompt, filename=None):
         print(f"🎨 Generating image for: '{prompt}'")
         print("⏳ This may take a moment...")
         
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=60)
+        response = pool.post(API_URL, headers=headers, json=payload, timeout=timeout)
         
         if response.status_code == 200:
             # Generate filename if not provided
@@ -74,13 +78,13 @@ def GenerateImage(prompt, filename=None):
             error_msg = response.json().get('error', 'Unknown error')
             return f"❌ Error generating image: {error_msg}"
     
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         return "⚠️ Request timed out. The model might be busy. Please try again."
     
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
-def GenerateImageWithRetry(prompt, filename=None, max_retries=3):
+def GenerateImageWithRetry(prompt, filename=None, max_retries=3, ctx=None):
     """
     Generate an image with retry logic for model loading
     
@@ -88,6 +92,8 @@ def GenerateImageWithRetry(prompt, filename=None, max_retries=3):
         prompt (str): The text prompt
         filename (str): Optional custom filename
         max_retries (int): Maximum number of retry attempts
+        ctx (QueryContext): Optional, stops retrying when the query is preempted;
+            each attempt's timeout is bounded by the query's remaining budget
     
     Returns:
         str: Status message
@@ -95,11 +101,20 @@ def GenerateImageWithRetry(prompt, filename=None, max_retries=3):
     import time
     
     for attempt in range(max_retries):
-        result = GenerateImage(prompt, filename)
+        if ctx and ctx.cancelled:
+            return ""
+        if ctx and ctx.expired:
+            return "⚠️ Image generation ran out of time. Please try again in a moment."
+        
+        result = GenerateImage(prompt, filename, timeout=RemainingBudget(ctx, 60))
         
         if "Model is loading" in result and attempt < max_retries - 1:
             print(f"🔄 Retry attempt {attempt + 1}/{max_retries}...")
-            time.sleep(10)  # Wait 10 seconds before retrying
+            # Wait 10 seconds before retrying, unless preempted
+            if ctx:
+                ctx.wait(10)
+            else:
+                time.sleep(10)
             continue
         
         return result
@@ -120,12 +135,12 @@ def GenerateImageFree(prompt, filename=None):
     """
     try:
         # Pollinations.ai endpoint
-        url = f"https://image.pollinations.ai/prompt/{requests.utils.quote(prompt)}"
+        url = f"https://image.pollinations.ai/prompt/{quote(prompt)}"
         
         print(f"🎨 Generating image for: '{prompt}'")
         print("⏳ Downloading...")
         
-        response = requests.get(url, timeout=30)
+        response = pool.get(url, timeout=30)
         
         if response.status_code == 200:
             # Generate filename if not provided
@@ -0,0 +1,193 @@
+"""
+Local fast path in front of the decision model.
+
+A small keyword grammar turns plain commands ("volume up", "open chrome and
+spotify", "search cats on youtube") into decision tasks without a network
+round trip. Every clause of the utterance has to match; the utterance's
+confidence is that of its weakest clause, and anything below the
+threshold falls through to the LLM.
+"""
+
+import re
+import time
+import threading
+from dotenv import dotenv_values
+from Backend.Handlers import registry
+from Backend.Reminder import ParseReminder
+
+env_vars = dotenv_values(".env")
+FastPathThreshold = float(env_vars.get("FastPathThreshold", "0.9"))
+
+# Dropped from the start of an utterance ("hey prism, could you please ...")
+FILLER = re.compile(r"^(?:(?:hey|ok|okay|hi)\s+)?(?:prism\s*,?\s*)?(?:(?:can|could|would|will)\s+you\s+)?(?:please\s+)?", re.I)
+TRAILING_FILLER = re.compile(r"[\s,]+(?:please|for me|now)$", re.I)
+CLAUSE_SPLIT = re.compile(r"\s*(?:,|\band then\b|\bthen\b|\band\b)\s*")
+
+# Longest target accepted for open/close/play before the clause counts as ambiguous
+MAX_TARGET_WORDS = 4
+# App and song names rarely start with these or end with an object pronoun:
+# "open up about your day", "play a game with me" are conversation
+CONVERSATIONAL_STARTS = {"a", "an", "up", "about", "with", "around", "me", "us", "your", "our"}
+CONVERSATIONAL_ENDS = {"me", "us", "myself", "yourself", "ourselves"}
+
+# (pattern, task template, confidence); templates use the pattern's groups
+GRAMMAR = [
+    (r"(?:bye|goodbye|good bye|exit|quit|shut ?down|see you(?: later)?|good night)", "exit", 0.99),
+
+    (r"(?:turn (?:the )?volume up|volume up|increase (?:the )?volume|louder)", "system volume up", 0.99),
+    (r"(?:turn (?:the )?volume down|volume down|decrease (?:the )?volume|lower (?:the )?volume|quieter)", "system volume down", 0.99),
+    (r"unmute(?: (?:the )?(?:volume|sound|audio))?", "system unmute", 0.99),
+    (r"mute(?: (?:the )?(?:volume|sound|audio))?", "system mute", 0.99),
+    (r"(?:take a )?screenshot", "system screenshot", 0.99),
+
+    (r"(?:search|look up) (?:google for|on google for) (.+)", "google search {0}", 0.97),
+    (r"(?:google|search|look up) (.+?) on google", "google search {0}", 0.97),
+    (r"google (?!search\b)(.+)", "google search {0}", 0.95),
+    (r"(?:search|look up) (?:youtube for|on youtube for) (.+)", "youtube search {0}", 0.97),
+    (r"(?:search|find|look up) (.+?) on youtube", "youtube search {0}", 0.97),
+
+    (r"(?:generate|create|make|draw) (?:an? )?(?:image|picture|photo|drawing) of (.+)", "generate image {0}", 0.97),
+    (r"open (.+)", "open {0}", 0.95),
+    (r"close (.+)", "close {0}", 0.95),
+    # "launch the missiles", "quit smoking tips", "kill time": usually not an app
+    (r"launch (.+)", "open {0}", 0.8),
+    (r"(?:quit|exit|kill) (.+)", "close {0}", 0.8),
+    (r"play (.+)", "play {0}", 0.95),
+
+    (r"(?:hi|hello|hey|hey prism|hello prism|good morning|good evening|good afternoon)", "general {query}", 0.95),
+    (r"(?:how are you(?: doing)?|what's up|whats up|thanks?(?: you)?(?: very much| so much)?|thank you prism)", "general {query}", 0.95),
+]
+GRAMMAR = [(re.compile(rf"^{pattern}$", re.I), template, confidence) for pattern, template, confidence in GRAMMAR]
+
+# "open chrome and firefox" -> open chrome, open firefox
+CONTINUED_VERBS = ("open", "close")
+# ...but "open spotify and what's the weather" starts a question, not an app name
+QUESTION_START = re.compile(r"^(?:what|what's|whats|who|who's|when|where|why|how|which|is|are|do|does|can|tell)\b")
+# ...and "open chrome and search for cats" a new request
+ACTION_START = re.compile(
+    r"^(?:search|google|look|find|play|write|read|send|summarize|summarise|tell|show|give|make|create|"
+    r"generate|draw|explain|translate|check|set|remind|turn|take|call|email|type|add|delete|remove|"
+    r"start|stop|launch|quit|exit|kill|go|let|help)\b")
+CONTINUATION_CONFIDENCE = 0.93
+
+# Prefixes the user might say verbatim; general/realtime/content need the model's judgement
+JUDGEMENT_PREFIXES = ("general", "realtime", "content", "exit")
+PREFIX_CONFIDENCE = 0.92
+
+def AmbiguousTarget(target):
+    """Whether an open/close/play target reads more like conversation than a name"""
+    words = target.split()
+    return (len(words) > MAX_TARGET_WORDS or not words or words[0] in CONVERSATIONAL_STARTS
+            or words[-1] in CONVERSATIONAL_ENDS)
+
+def Normalize(text):
+    """Lowercase, drop filler words and trailing punctuation, collapse whitespace"""
+    text = " ".join(text.lower().split()).strip(" .!?")
+    text = TRAILING_FILLER.sub("", FILLER.sub("", text))
+    return text.strip(" ,")
+
+class IntentMatcher:
+    def __init__(self, threshold=FastPathThreshold):
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.intents = {}
+        self.match_seconds = 0.0
+
+    def match_clause(self, clause, query):
+        """Return (task, confidence) for one clause, or (None, 0.0)"""
+        reminder = re.match(r"^remind me (?:to |about |that )?(.+)$", clause)
+        if reminder:
+            due, message = ParseReminder(reminder.group(1))
+            return (f"reminder {reminder.group(1)}", 0.95) if due and message else (None, 0.0)
+
+        for pattern, template, confidence in GRAMMAR:
+            found = pattern.match(clause)
+            if not found:
+                continue
+            groups = [g.strip() for g in found.groups()]
+            if template.split()[0] in ("open", "close", "play") and AmbiguousTarget(groups[0]):
+                # "open up about my day..." is probably conversation
+                return template.format(*groups, query=query), 0.5
+            return template.format(*groups, query=query), confidence
+
+        # Already phrased as a task, e.g. "youtube search lofi"
+        handler, argument = registry.dispatch(clause)
+        if handler and argument and not handler.prefix.startswith(JUDGEMENT_PREFIXES):
+            return clause, PREFIX_CONFIDENCE
+        return None, 0.0
+
+    def classify(self, prompt):
+        """Return (tasks, confidence). tasks is None when the LLM should decide."""
+        query = " ".join(prompt.split())
+        # "hey prism" is all filler; match it as said
+        text = Normalize(prompt) or query.lower().strip(" .!?")
+        if not text:
+            return None, 0.0
+
+        # Clause by clause first ("open notepad and open calculator"), then the
+        # whole utterance so "play rock and roll" stays one task
+        tasks = self.classify_clauses(text, query)
+        if tasks[0] is not None:
+            return tasks
+        return self.classify_whole(text, query)
+
+    def classify_whole(self, text, query):
+        task, confidence = self.match_clause(text, query)
+        return ([task], confidence) if task else (None, 0.0)
+
+    def classify_clauses(self, text, query):
+        clauses = [c for c in CLAUSE_SPLIT.split(text) if c]
+        if len(clauses) < 2:
+            return None, 0.0
+        tasks, confidence = [], 1.0
+        for clause in clauses:
+            task, clause_confidence = self.match_clause(Normalize(clause), query)
+            if task is None:
+                # "open chrome and firefox": a bare app name continues the previous verb
+                verb = tasks[-1].split()[0] if tasks else None
+                if (verb not in CONTINUED_VERBS or AmbiguousTarget(clause) or QUESTION_START.match(clause)
+                        or ACTION_START.match(clause)):
+                    return None, 0.0
+                task, clause_confidence = f"{verb} {clause}", CONTINUATION_CONFIDENCE
+            tasks.append(task)
+            confidence = min(confidence, clause_confidence)
+        return tasks, confidence
+
+    def decide(self, prompt):
+        """Fast-path decision: tasks if confident enough, else None. Updates the hit stats."""
+        start = time.perf_counter()
+        tasks, confidence = self.classify(prompt)
+        elapsed = time.perf_counter() - start
+        hit = tasks is not None and confidence >= self.threshold
+
+        with self.lock:
+            self.match_seconds += elapsed
+            if hit:
+                self.hits += 1
+                for task in tasks:
+                    intent = registry.dispatch(task)[0]
+                    name = intent.prefix if intent else task.split()[0]
+                    self.intents[name] = self.intents.get(name, 0) + 1
+            else:
+                self.misses += 1
+        return (tasks if hit else None), confidence
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "mean_us": self.match_seconds / total * 1e6 if total else 0.0,
+                "intents": dict(self.intents),
+            }
+
+    def report(self):
+        stats = self.stats()
+        print(f"[FAST PATH]: {stats['hits']}/{stats['hits'] + stats['misses']} decisions local "
+              f"({stats['hit_rate']:.0%}), mean match {stats['mean_us']:.0f} µs, intents {stats['intents']}")
+
+matcher = IntentMatcher()
@@ -0,0 +1,252 @@
+"""
+Nearest-neighbour intent model for the decision layer.
+
+Utterances are turned into hashed n-gram counts (word unigrams and bigrams
+plus character trigrams) and compared by TF-IDF cosine similarity against
+every utterance the decision model has classified before, seeded with the
+few-shot ChatHistory. Queries are scored in vectorized batches.
+
+The model only answers decisions whose task is the utterance itself
+('general <query>', 'realtime <query>'); tasks with arguments
+(open/play/...) are left to the keyword grammar and the LLM, and exit to
+the keyword grammar and the control lane, so a lookalike question can
+never end the session.
+
+Storage under Data/IntentModel/ is a preallocated float16 matrix opened
+with np.memmap, so startup maps the file instead of reading it and every
+logged decision is appended in place:
+
+    rows.f16    (capacity x dims) hashed n-gram counts
+    df.npy      document frequency per dimension
+    meta.json   dims, row count, capacity, labels and normalized texts
+"""
+
+import os
+import json
+import zlib
+import threading
+from dotenv import dotenv_values
+from Backend.IntentMatcher import Normalize, CLAUSE_SPLIT
+from Backend.CommandQueue import NormalizeCommand
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+env_vars = dotenv_values(".env")
+IntentModelDims = int(env_vars.get("IntentModelDims", "4096"))
+IntentModelThreshold = float(env_vars.get("IntentModelThreshold", "0.65"))
+INTENT_MODEL_DIR = os.path.join("Data", "IntentModel")
+
+# Labels the model may answer on its own: the task argument is the utterance
+QUERY_LABELS = ("general", "realtime")
+NEIGHBOURS = 5
+# Neighbours that must share the winning label; one lone example is not enough
+MIN_AGREEMENT = 2
+
+def Features(text):
+    """Word unigrams/bigrams and character trigrams of a normalized utterance"""
+    words = text.split()
+    features = [f"w:{w}" for w in words]
+    features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return features
+
+def Vectorize(texts, dims=IntentModelDims):
+    """(len(texts), dims) matrix of hashed feature counts (needs numpy)"""
+    matrix = np.zeros((len(texts), dims), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for feature in Features(text):
+            matrix[i, zlib.crc32(feature.encode()) % dims] += 1
+    return matrix
+
+def DecisionLabel(tasks):
+    """'general what is ai' -> 'general'; multi-task decisions keep every prefix"""
+    prefixes = []
+    for task in tasks:
+        words = task.split()
+        if words:
+            prefixes.append(" ".join(words[:2]) if words[0] in ("google", "youtube", "generate", "system")
+                            else words[0])
+    return ", ".join(prefixes)
+
+class IntentModel:
+    def __init__(self, path=INTENT_MODEL_DIR, dims=IntentModelDims, threshold=IntentModelThreshold):
+        self.path = path
+        self.dims = dims
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.rows = None
+        self.count = 0
+        self.capacity = 0
+        self.df = None
+        self.labels = []
+        self.texts = []
+        self.seen = set()
+        self.norms = None
+        self.stats_counts = {"hits": 0, "misses": 0}
+
+    @property
+    def available(self):
+        return np is not None
+
+    def vectorize(self, texts):
+        return Vectorize(texts, self.dims)
+
+    def load(self, seed=()):
+        """Map the saved matrix, or build it from seed (utterance, tasks) pairs"""
+        if not self.available:
+            return self
+        meta_path = os.path.join(self.path, "meta.json")
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            if meta["dims"] != self.dims:
+                raise ValueError("dimension changed")
+            self.count, self.capacity = meta["count"], meta["capacity"]
+            self.labels, self.texts = meta["labels"], meta["texts"]
+            self.rows = np.memmap(os.path.join(self.path, "rows.f16"), dtype=np.float16, mode="r+",
+                                  shape=(self.capacity, self.dims))
+            self.df = np.load(os.path.join(self.path, "df.npy"))
+            self.seen = set(zip(self.texts, self.labels))
+        except (FileNotFoundError, ValueError, KeyError):
+            self.create()
+            self.add_many(seed)
+        return self
+
+    def create(self, capacity=256):
+        os.makedirs(self.path, exist_ok=True)
+        self.count, self.capacity = 0, capacity
+        self.labels, self.texts, self.seen = [], [], set()
+        self.rows = np.memmap(os.path.join(self.path, "rows.f16"), dtype=np.float16, mode="w+",
+                              shape=(capacity, self.dims))
+        self.df = np.zeros(self.dims, dtype=np.float32)
+        self.norms = None
+
+    def grow(self):
+        """Double the preallocated matrix"""
+        old = np.array(self.rows[:self.count])
+        self.rows.flush()
+        del self.rows
+        self.capacity *= 2
+        self.rows = np.memmap(os.path.join(self.path, "rows.f16"), dtype=np.float16, mode="r+",
+                              shape=(self.capacity, self.dims))
+        self.rows[:self.count] = old
+
+    def add(self, prompt, tasks):
+        """Learn one decision; returns False for duplicates or without numpy"""
+        return self.add_many([(prompt, tasks)]) > 0
+
+    def add_many(self, examples):
+        if not self.available or self.rows is None:
+            return 0
+        added = 0
+        with self.lock:
+            for prompt, tasks in examples:
+                text, label = NormalizeCommand(Normalize(prompt)), DecisionLabel(tasks)
+                if not text or not label or (text, label) in self.seen:
+                    continue
+                if self.count == self.capacity:
+                    self.grow()
+                counts = self.vectorize([text])[0]
+                self.rows[self.count] = counts
+                self.df += counts > 0
+                self.texts.append(text)
+                self.labels.append(label)
+                self.seen.add((text, label))
+                self.count += 1
+                added += 1
+            if added:
+                # IDF changed, so every row norm has to be recomputed
+                self.norms = None
+                self.save()
+        return added
+
+    def save(self):
+        self.rows.flush()
+        np.save(os.path.join(self.path, "df.npy"), self.df)
+        temp = os.path.join(self.path, "meta.json.tmp")
+        with open(temp, "w") as f:
+            json.dump({"dims": self.dims, "count": self.count, "capacity": self.capacity,
+                       "labels": self.labels, "texts": self.texts}, f)
+        os.replace(temp, os.path.join(self.path, "meta.json"))
+
+    def idf(self):
+        return np.log((1 + self.count) / (1 + self.df)) + 1
+
+    def predict_batch(self, prompts):
+        """[(label, score)] per prompt by similarity-weighted vote of the nearest neighbours"""
+        if not self.available or not self.count:
+            return [(None, 0.0)] * len(prompts)
+        texts = [NormalizeCommand(Normalize(p)) for p in prompts]
+        with self.lock:
+            # cos(q, r) over TF-IDF vectors without materializing the weighted
+            # matrix: (q * idf) . (r * idf) = (q * idf^2) . r
+            idf = self.idf()
+            rows = self.rows[:self.count]
+            if self.norms is None:
+                self.norms = np.sqrt(np.square(rows, dtype=np.float32) @ np.square(idf)) + 1e-9
+            queries = self.vectorize(texts) * idf
+            queries /= np.linalg.norm(queries, axis=1, keepdims=True) + 1e-9
+            scores = (queries * idf) @ rows.T.astype(np.float32) / self.norms
+            labels = self.labels
+
+        k = min(NEIGHBOURS, scores.shape[1])
+        nearest = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        predictions = []
+        for i, neighbours in enumerate(nearest):
+            # Only neighbours at least half as close as the nearest one vote
+            floor = scores[i, neighbours].max() / 2
+            votes = {}
+            voters = {}
+            for j in neighbours:
+                if scores[i, j] > 0 and scores[i, j] >= floor:
+                    votes[labels[j]] = votes.get(labels[j], 0.0) + scores[i, j]
+                    voters[labels[j]] = voters.get(labels[j], 0) + 1
+            if not votes:
+                predictions.append((None, 0.0))
+                continue
+            label = max(votes, key=votes.get)
+            if voters[label] < MIN_AGREEMENT:
+                predictions.append((label, 0.0))
+                continue
+            # Confidence: best similarity among the winning label's neighbours,
+            # discounted by how much of the vote went elsewhere
+            best = max(scores[i, j] for j in neighbours if labels[j] == label)
+            share = votes[label] / sum(votes.values())
+            predictions.append((label, float(best * share)))
+        return predictions
+
+    def classify(self, prompt):
+        """Return (tasks, confidence). tasks is None when the model cannot answer on its own."""
+        if len(CLAUSE_SPLIT.split(Normalize(prompt))) > 1:
+            # "open spotify and what's the weather" may need several tasks
+            return None, 0.0
+        label, confidence = self.predict_batch([prompt])[0]
+        if label not in QUERY_LABELS or confidence < self.threshold:
+            return None, confidence
+        return [f"{label} {prompt}"], confidence
+
+    def decide(self, prompt):
+        """classify() that also updates the hit stats"""
+        tasks, confidence = self.classify(prompt)
+        with self.lock:
+            self.stats_counts["hits" if tasks else "misses"] += 1
+        return tasks, confidence
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.stats_counts, examples=self.count)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def report(self):
+        stats = self.stats()
+        print(f"[INTENT MODEL]: {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+              f"{stats['examples']} examples")
+
+intent_model = IntentModel()
@@ -0,0 +1,129 @@
+import sys
+import time
+import importlib
+import importlib.abc
+import threading
+
+# Packages whose import time is profiled
+PROFILED_PACKAGES = ("Backend.", "Frontend.")
+
+class StartupProfiler:
+    """Import/initialization time per module plus named startup milestones"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.entries = []
+        self.lock = threading.Lock()
+
+    def record(self, name, kind, seconds):
+        with self.lock:
+            self.entries.append((name, kind, seconds, time.perf_counter() - self.start))
+
+    def mark(self, milestone):
+        """Record time since process start for a milestone such as 'listening'"""
+        self.record(milestone, "milestone", time.perf_counter() - self.start)
+
+    def timed(self, name, kind="init"):
+        profiler = self
+
+        class Timer:
+            def __enter__(self):
+                self.begin = time.perf_counter()
+
+            def __exit__(self, *exc):
+                profiler.record(name, kind, time.perf_counter() - self.begin)
+
+        return Timer()
+
+    def report(self):
+        print("\n" + "=" * 70)
+        print(f"{'Startup':<36}{'kind':<12}{'ms':>10}{'at ms':>12}")
+        print("-" * 70)
+        with self.lock:
+            entries = list(self.entries)
+        for name, kind, seconds, at in entries:
+            print(f"{name:<36}{kind:<12}{seconds * 1000:>10.1f}{at * 1000:>12.1f}")
+        print("=" * 70)
+
+class ProfilingFinder(importlib.abc.MetaPathFinder):
+    """Times module execution of the assistant's own packages"""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        if not fullname.startswith(PROFILED_PACKAGES):
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader and hasattr(spec.loader, "exec_module"):
+                    exec_module = spec.loader.exec_module
+                    profiler = self.profiler
+
+                    def timed_exec(module, _exec=exec_module, _name=fullname):
+                        begin = time.perf_counter()
+                        try:
+                            _exec(module)
+                        finally:
+                            # Includes nested imports made by the module body
+                            profiler.record(_name, "import", time.perf_counter() - begin)
+
+                    spec.loader.exec_module = timed_exec
+                return spec
+        return None
+
+class LazyModule:
+    """
+    Stand-in for a backend module that is imported on first attribute access.
+
+    Backends do real work at import time (SDK clients, pyttsx3, Chrome), so
+    the core only pays for the ones a query actually uses.
+    """
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self):
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self.__dict__['_name']} ({state})>"
+
+def Preload(modules):
+    """Import lazy modules on a background thread (e.g. while idle after startup)"""
+    def worker():
+        for module in modules:
+            try:
+                module._load()
+            except Exception as e:
+                print(f"[STARTUP]: Preload of {module!r} failed: {e}")
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    return thread
+
+profiler = StartupProfiler()
+sys.meta_path.insert(0, ProfilingFinder(profiler))
@@ -0,0 +1,172 @@
+"""
+Long-term conversational memory.
+
+Instead of the last ten turns, each prompt carries:
+    - a rolling summary of the conversation outside the recent window: one
+      line per earlier exchange (the question and the first sentence of the
+      answer), newest kept
+    - the top-k earlier exchanges most relevant to the new query, found with
+      BM25 over an in-memory inverted index of every stored exchange
+    - the last exchange, so follow-ups ("tell me more") still work
+
+The index is built from the conversation store on first use and then
+extended as the store appends turns, so nothing is persisted twice and
+building a prompt never reads the database.
+"""
+
+import re
+import math
+import threading
+from dotenv import dotenv_values
+from Backend.ConversationStore import store
+
+env_vars = dotenv_values(".env")
+# Most recent turns always sent verbatim (one question and its answer)
+MemoryRecentTurns = int(env_vars.get("MemoryRecentTurns", "2"))
+# Relevant earlier exchanges retrieved per prompt, and the BM25 score they need
+MemoryTopK = int(env_vars.get("MemoryTopK", "3"))
+MemoryMinScore = float(env_vars.get("MemoryMinScore", "1.0"))
+# Earlier exchanges listed in the rolling summary
+MemorySummaryItems = int(env_vars.get("MemorySummaryItems", "8"))
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "do", "does", "did", "i", "you", "me",
+    "my", "your", "it", "its", "of", "in", "on", "at", "to", "for", "and", "or", "but", "with", "as",
+    "by", "from", "that", "this", "what", "who", "how", "why", "when", "where", "which", "can", "could",
+    "would", "should", "will", "tell", "about", "please", "so", "if", "there", "they", "them", "we",
+}
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+def Tokens(text):
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+def FirstSentence(text, limit=120):
+    sentence = SENTENCE_END.split(text.strip(), 1)[0]
+    return sentence if len(sentence) <= limit else sentence[:limit].rsplit(" ", 1)[0] + "..."
+
+class ConversationMemory:
+    def __init__(self, store=store, recent=MemoryRecentTurns, top_k=MemoryTopK, min_score=MemoryMinScore,
+                 summary_items=MemorySummaryItems):
+        self.store = store
+        self.recent = recent
+        self.top_k = top_k
+        self.min_score = min_score
+        self.summary_items = summary_items
+        self.lock = threading.Lock()
+        self.follow_lock = threading.Lock()
+        self.following = False
+        # Exchanges in order: {"id", "question", "answer", "length"}
+        self.exchanges = []
+        self.pending = None
+        # term -> {exchange index: term frequency}
+        self.postings = {}
+        self.total_length = 0
+        self.stats_counts = {"prompts": 0, "retrieved": 0, "context_chars": 0, "tail_chars": 0}
+
+    def follow(self):
+        """Index the stored conversation once, then every turn as the store appends it"""
+        with self.follow_lock:
+            if not self.following:
+                self.store.follow(self.add)
+                self.following = True
+
+    def add(self, turns):
+        """Index newly stored turns (called by the store)"""
+        with self.lock:
+            for turn in turns:
+                if turn["role"] == "user":
+                    self.pending = turn
+                elif turn["role"] == "assistant" and self.pending is not None:
+                    self.index(self.pending, turn)
+                    self.pending = None
+
+    def index(self, question, answer):
+        tokens = Tokens(question["content"]) + Tokens(answer["content"])
+        position = len(self.exchanges)
+        self.exchanges.append({"id": question["id"], "question": question["content"],
+                               "answer": answer["content"], "length": len(tokens)})
+        self.total_length += len(tokens)
+        for token in tokens:
+            postings = self.postings.setdefault(token, {})
+            postings[position] = postings.get(position, 0) + 1
+
+    def search(self, query, limit, before):
+        """Up to limit (score, exchange) pairs relevant to query among the first before exchanges"""
+        if not before:
+            return []
+        average = self.total_length / len(self.exchanges)
+        scores = {}
+        for token in set(Tokens(query)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (len(self.exchanges) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, tf in postings.items():
+                if position >= before:
+                    continue
+                length = self.exchanges[position]["length"]
+                scores[position] = scores.get(position, 0.0) + \
+                    idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / average))
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(score, self.exchanges[position]) for position, score in ranked if score >= self.min_score]
+
+    def summary(self, before, exclude=()):
+        """One line per earlier exchange outside the recent window (and not in exclude), newest last"""
+        lines = [f"- {e['question'].strip()} -> {FirstSentence(e['answer'])}"
+                 for e in self.exchanges[max(0, before - self.summary_items):before] if e["id"] not in exclude]
+        if not lines:
+            return ""
+        skipped = before - len(lines)
+        header = "Earlier in this conversation" + (f" (plus {skipped} other exchanges)" if skipped else "") + ":"
+        return "\n".join([header] + lines)
+
+    def context(self, query, tail_turns=10):
+        """
+        (summary, messages) for a prompt about query: the summary text for the
+        system prompt and the relevant plus recent turns as chat messages,
+        oldest first. tail_turns is only used to measure the savings against
+        sending the last tail_turns turns.
+        """
+        self.follow()
+        with self.lock:
+            recent_exchanges = (self.recent + 1) // 2
+            before = max(0, len(self.exchanges) - recent_exchanges)
+            relevant = sorted(self.search(query, self.top_k, before), key=lambda item: item[1]["id"])
+            # Retrieved exchanges are sent in full, so the summary leaves them out
+            summary = self.summary(before, {exchange["id"] for _, exchange in relevant})
+            messages = []
+            for _, exchange in relevant:
+                messages += [{"role": "user", "content": exchange["question"]},
+                             {"role": "assistant", "content": exchange["answer"]}]
+        messages += self.store.tail(self.recent)
+
+        context_chars = len(summary) + sum(len(m["content"]) for m in messages)
+        # Outside the lock: the store calls add() under its own lock
+        tail_chars = sum(len(m["content"]) for m in self.store.tail(tail_turns))
+        with self.lock:
+            self.stats_counts["prompts"] += 1
+            self.stats_counts["retrieved"] += len(relevant)
+            self.stats_counts["context_chars"] += context_chars
+            self.stats_counts["tail_chars"] += tail_chars
+        return summary, messages
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.stats_counts, exchanges=len(self.exchanges))
+        prompts = stats["prompts"]
+        stats["avg_context_chars"] = stats["context_chars"] / prompts if prompts else 0.0
+        stats["avg_tail_chars"] = stats["tail_chars"] / prompts if prompts else 0.0
+        return stats
+
+    def report(self):
+        stats = self.stats()
+        print(f"[MEMORY]: {stats['exchanges']} exchanges indexed, {stats['retrieved']} retrieved over "
+              f"{stats['prompts']} prompts, {stats['avg_context_chars']:.0f} context chars per prompt "
+              f"(last-10 history would be {stats['avg_tail_chars']:.0f})")
+
+memory = ConversationMemory()
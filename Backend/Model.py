@@ -1,25 +1,38 @@
-import cohere
+import re
 from rich import print
 from dotenv import dotenv_values
+from Backend.Handlers import registry
+from Backend.QueryContext import RemainingBudget
+from Backend.IntentMatcher import matcher
+from Backend.DecisionCache import cache
+from Backend.IntentModel import intent_model
+from Backend.HttpPool import CohereClient
 
 # Load environment variables
 env_vars = dotenv_values(".env")
 CohereAPIKey = env_vars.get("CohereAPIKey")
+CohereBaseURL = env_vars.get("CohereBaseURL")
+# Seconds the decision may take, shortened further by the query's remaining budget
+DecisionTimeout = float(env_vars.get("DecisionTimeout", "10"))
 
 # Initialize Cohere Client with error handling
 co = None
 try:
-    co = cohere.Client(api_key=CohereAPIKey)
+    co = CohereClient()
 except Exception as e:
     print(f"Warning: Cohere client initialization failed: {e}")
     print("Model will attempt to reinitialize on first use.")
 
+# Built-in task prefixes; plugins add theirs through the handler registry
 funcs = [
     "exit", "general", "realtime", "open", "close", "play",
     "generate image", "system", "content", "google search",
     "youtube search", "reminder"
 ]
 
+# Placeholder the model occasionally copies from the instructions
+PLACEHOLDER = re.compile(r"\(\s*query\s*\)", re.I)
+
 messages = []
 
 preamble = """
@@ -41,6 +54,12 @@ You will decide whether a query is a 'general' query, a 'realtime' query, or is
 *** If the user says goodbye, bye, exit, quit, shutdown, or similar, respond ONLY with 'exit'. ***
 """
 
+# Appended to the preamble when several utterances are decided in one call
+BATCH_PREAMBLE = """
+*** Several numbered queries may be given, one per line. Decide each one on its own and answer with one line per query, formatted as '<number>: <decision>'. ***
+"""
+BATCH_LINE = re.compile(r"^\s*(\d+)\s*[:.)]\s*(.+)$")
+
 ChatHistory = [
     {"role": "User", "text": "how are you?"},
     {"role": "Chatbot", "text": "general how are you?"},
@@ -62,21 +81,92 @@ ChatHistory = [
     {"role": "Chatbot", "text": "general chat with me."}
 ]
 
-def FirstLayerDMM(prompt: str = "test"):
-    global co
+# The few-shot examples as (utterance, tasks); they seed the nearest-neighbour
+# model on first start, afterwards it grows from every decision the model makes
+SEED_DECISIONS = [
+    (user["text"], [task.strip() for task in bot["text"].split(",")])
+    for user, bot in zip(ChatHistory[::2], ChatHistory[1::2])
+]
+intent_model.load(seed=SEED_DECISIONS)
+
+class TaskStreamParser:
+    """
+    Splits streamed decision text into tasks, emitting each one as soon as
+    the comma after it arrives.
+    """
+
+    def __init__(self, prompt):
+        self.prompt = prompt
+        self.buffer = ""
+
+    def feed(self, text):
+        """Add streamed text; return the tasks it completed"""
+        self.buffer += text.replace("\n", "")
+        *completed, self.buffer = self.buffer.split(",")
+        return [task for task in map(self.clean, completed) if task]
+
+    def close(self):
+        """The final task, once the stream has ended normally"""
+        task = self.clean(self.buffer)
+        self.buffer = ""
+        return [task] if task else []
+
+    def clean(self, task):
+        task = task.strip()
+        # The model sometimes echoes the '(query)' placeholder; use the
+        # user's own words instead of asking it again
+        task = PLACEHOLDER.sub(lambda m: self.prompt, task)
+        if task and (registry.dispatch(task)[0] or any(task.startswith(func) for func in funcs)):
+            return task
+        return None
+
+def LocalDecision(prompt):
+    """Tasks from the fast path, the decision cache or the intent model, or None if Cohere has to decide"""
+    # Plain commands are decided locally; only ambiguous ones go to Cohere
+    tasks, confidence = matcher.decide(prompt)
+    if tasks:
+        print(f"[FAST PATH]: {tasks} (confidence {confidence:.2f})")
+        return tasks
     
-    # Quick exit detection (skip AI for common exit phrases)
-    exit_phrases = ['bye', 'goodbye', 'exit', 'quit', 'shutdown', 'close', 'see you']
-    if any(phrase in prompt.lower() for phrase in exit_phrases):
-        # Check if it's ONLY an exit command (not "goodbye and open chrome")
-        words = prompt.lower().split()
-        if len(words) <= 2 and any(phrase in prompt.lower() for phrase in exit_phrases):
-            return ["exit"]
+    # Repeated commands reuse the model's earlier decision
+    tasks = cache.get(prompt)
+    if tasks:
+        print(f"[DECISION CACHE]: {tasks}")
+        return tasks
     
+    # Utterances close to ones the model already answered as a plain query
+    tasks, confidence = intent_model.decide(prompt)
+    if tasks:
+        print(f"[INTENT MODEL]: {tasks} (confidence {confidence:.2f})")
+        return tasks
+    return None
+
+def StreamDecision(prompt, ctx=None):
+    """
+    Yield the query's tasks one at a time, each as soon as it is known, so
+    the caller can start the first task while the model is still writing
+    the rest. With a ctx, the stream stops at cancellation or the deadline
+    and only the tasks completed so far are used.
+    """
+    tasks = LocalDecision(prompt)
+    if tasks:
+        yield from tasks
+        return
+    yield from ModelDecision(prompt, ctx)
+
+def ModelDecision(prompt, ctx=None):
+    """
+    The Cohere part of StreamDecision: stream the model's tasks, remember
+    complete decisions, and fall back to a general query when the model
+    gives nothing usable.
+    """
+    global co
+    
+    emitted = []
     try:
         # Reinitialize client if needed
         if co is None:
-            co = cohere.Client(api_key=CohereAPIKey)
+            co = CohereClient()
         
         stream = co.chat_stream(
             model='command-r-08-2024',
@@ -84,37 +174,110 @@ def FirstLayerDMM(prompt: str = "test"):
             temperature=0.7,
             chat_history=ChatHistory,
             prompt_truncation='OFF',
-            preamble=preamble
+            preamble="\n".join([preamble] + registry.descriptions()),
+            request_options={"timeout_in_seconds": RemainingBudget(ctx, DecisionTimeout)}
         )
 
-        response_text = ""
+        parser = TaskStreamParser(prompt)
+        complete = True
         for event in stream:
+            if ctx and (ctx.cancelled or ctx.expired):
+                # The task being written may be cut off mid-word; drop it
+                complete = False
+                break
             if event.event_type == "text-generation":
-                response_text += event.text
-        
-        # Process and filter the tasks
-        tasks = [i.strip() for i in response_text.replace("\n", "").split(",")]
+                for task in parser.feed(event.text):
+                    emitted.append(task)
+                    yield task
         
-        filtered_tasks = []
-        for task in tasks:
-            for func in funcs:
-                if task.startswith(func):
-                    filtered_tasks.append(task)
-                    break
-
-        # Recursion check: if model uses placeholder '(query)'
-        if any("(query)" in item for item in filtered_tasks):
-            return FirstLayerDMM(prompt=prompt)
-        
-        return filtered_tasks if filtered_tasks else ["general " + prompt]
+        if complete:
+            for task in parser.close():
+                emitted.append(task)
+                yield task
+            # Only complete, usable decisions are worth remembering
+            if emitted:
+                cache.put(prompt, emitted)
+                intent_model.add(prompt, emitted)
     
     except Exception as e:
         print(f"Error in FirstLayerDMM: {str(e)}")
         # Check for exit command on error
-        if any(phrase in prompt.lower() for phrase in ['bye', 'goodbye', 'exit', 'quit']):
-            return ["exit"]
-        # Fallback: treat as general query
-        return ["general " + prompt]
+        if not emitted and any(phrase in prompt.lower() for phrase in ['bye', 'goodbye', 'exit', 'quit']):
+            emitted.append("exit")
+            yield "exit"
+    
+    # Fallback: treat as general query
+    if not emitted:
+        yield "general " + prompt
+
+def NeedsModel(prompt):
+    """True if the decision will go to Cohere (no fast path, cache or intent model answer)"""
+    tasks, confidence = matcher.classify(prompt)
+    if tasks and confidence >= matcher.threshold:
+        return False
+    return not cache.contains(prompt) and intent_model.classify(prompt)[0] is None
+
+def ModelBatch(prompts, ctx=None):
+    """
+    Decide several utterances in one Cohere call. Returns one task list per
+    prompt, None where the answer for that prompt could not be parsed.
+    """
+    global co
+    
+    decisions = [None] * len(prompts)
+    try:
+        if co is None:
+            co = CohereClient()
+        
+        message = "\n".join(f"{i}. {prompt}" for i, prompt in enumerate(prompts, 1))
+        response = co.chat(
+            model='command-r-08-2024',
+            message=message,
+            temperature=0.7,
+            chat_history=ChatHistory,
+            prompt_truncation='OFF',
+            preamble="\n".join([preamble, BATCH_PREAMBLE] + registry.descriptions()),
+            request_options={"timeout_in_seconds": RemainingBudget(ctx, DecisionTimeout)}
+        )
+    except Exception as e:
+        print(f"Error in BatchDecision: {str(e)}")
+        return decisions
+    
+    for line in response.text.splitlines():
+        numbered = BATCH_LINE.match(line)
+        if not numbered or not 1 <= int(numbered.group(1)) <= len(prompts):
+            continue
+        index = int(numbered.group(1)) - 1
+        parser = TaskStreamParser(prompts[index])
+        tasks = parser.feed(numbered.group(2)) + parser.close()
+        if tasks:
+            decisions[index] = tasks
+            cache.put(prompts[index], tasks)
+            intent_model.add(prompts[index], tasks)
+    return decisions
+
+def BatchDecision(prompts, ctx=None):
+    """
+    Task lists for several queued utterances. Those not decided locally
+    share a single model call (one few-shot prompt instead of one each);
+    any the batch answer leaves out are decided individually.
+    """
+    decisions = [LocalDecision(prompt) for prompt in prompts]
+    pending = [i for i, tasks in enumerate(decisions) if not tasks]
+    
+    if len(pending) > 1:
+        print(f"[BATCH DECISION]: {len(pending)} utterances in one call")
+        for i, tasks in zip(pending, ModelBatch([prompts[i] for i in pending], ctx)):
+            decisions[i] = tasks
+    
+    for i in pending:
+        if not decisions[i]:
+            decisions[i] = list(ModelDecision(prompts[i], ctx))
+    return decisions
+
+def FirstLayerDMM(prompt: str = "test", ctx=None):
+    """Classify a query into its full task list (see StreamDecision)"""
+    return list(StreamDecision(prompt, ctx))
 
 if __name__ == "__main__":
     while True:
@@ -0,0 +1,129 @@
+import time
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+from dotenv import dotenv_values
+from Backend.Tracer import NewTraceId
+
+env_vars = dotenv_values(".env")
+# Seconds from the start of processing until a query must produce its answer
+QueryBudget = float(env_vars.get("QueryBudget", "45"))
+# Extra time backends get to return a partial answer once the budget is spent
+DeadlineGrace = float(env_vars.get("DeadlineGrace", "1.5"))
+
+class QueryCancelled(Exception):
+    """Raised when an in-flight query is preempted"""
+
+class QueryContext:
+    """
+    Per-query state shared by the core and every backend call it makes.
+
+    Backends receive it as an optional ctx argument and check it between
+    stream chunks and retries, so a control command can preempt them.
+
+    A query may also carry a deadline. Cancellation discards the query,
+    while an expired deadline means "answer with what you have". Backends
+    size their network timeouts from the remaining budget and cut streams
+    short, returning a partial or fallback answer.
+    """
+
+    def __init__(self, query="", budget=None):
+        self.query = query
+        self.trace_id = NewTraceId()
+        self.event = threading.Event()
+        self.reason = None
+        self.callbacks = []
+        self.lock = threading.Lock()
+        self.deadline = None
+        # When the utterance began (Main moves it back to the start of speech)
+        # and when its first answer started playing
+        self.started = time.time()
+        self.first_audio = None
+        if budget:
+            self.set_deadline(budget)
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def set_deadline(self, budget=QueryBudget):
+        """Start the query's budget (called when processing begins, not when queued)"""
+        self.deadline = time.time() + budget
+
+    def remaining(self):
+        """Seconds left in the budget, or None without a deadline"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.time()
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def timeout(self, cap, floor=0.1):
+        """A network timeout: cap, shortened to the remaining budget"""
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        return max(min(cap, remaining), floor)
+
+    def wait_limit(self, timeout=None):
+        """How long the core should wait on a backend: timeout, bounded by budget plus grace"""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        limit = max(remaining, 0) + DeadlineGrace
+        return limit if timeout is None else min(timeout, limit)
+
+    def cancel(self, reason="cancelled"):
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.reason = reason
+            self.event.set()
+            callbacks = list(self.callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[CTX]: Cancel callback error: {e}")
+
+    def on_cancel(self, callback):
+        """Run callback when the query is cancelled (immediately if it already is)"""
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()
+
+    def remove_cancel(self, callback):
+        """Forget a callback registered with on_cancel (no-op if it already ran or is unknown)"""
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+    def check(self):
+        if self.cancelled:
+            raise QueryCancelled(self.reason)
+
+    def wait(self, seconds):
+        """Sleep that wakes up early on cancellation or at the deadline. Returns True if cancelled."""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = max(min(seconds, remaining), 0)
+        return self.event.wait(seconds)
+
+    def wait_future(self, future, timeout=None):
+        """Wait for a future unless the query is cancelled or the timeout/budget runs out first"""
+        done = threading.Event()
+        future.add_done_callback(lambda f: done.set())
+        self.on_cancel(done.set)
+        done.wait(self.wait_limit(timeout))
+        if not future.done():
+            if self.cancelled:
+                raise QueryCancelled(self.reason)
+            raise FutureTimeout()
+        return future.result()
+
+def RemainingBudget(ctx, cap):
+    """Timeout for one backend call: cap, or less if the query's budget is nearly spent"""
+    return ctx.timeout(cap) if ctx else cap
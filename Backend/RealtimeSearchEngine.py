@@ -1,20 +1,31 @@
+import time
 import datetime
-import requests
-from json import load, dump
 from dotenv import dotenv_values
-import os
+from Backend.Tracer import tracer
+from Backend.QueryContext import RemainingBudget
+from Backend.ConversationStore import store
+from Backend.CircuitBreaker import health, CircuitOpen
+from Backend.Memory import memory
+from Backend.HttpPool import pool, CerebrasClient
 
 env_vars = dotenv_values(".env")
 Username = env_vars.get("Username")
 Assistantname = env_vars.get("Assistantname")
 CerebrasAPIKey = env_vars.get("CerebrasAPIKey")
 SerperAPIKey = env_vars.get("SerperAPIKey")
+CerebrasBaseURL = env_vars.get("CerebrasBaseURL")
+SerperURL = env_vars.get("SerperURL", "https://google.serper.dev/search")
+# Per-request caps in seconds, shortened further by the query's remaining budget
+SerperTimeout = float(env_vars.get("SerperTimeout", "8"))
+CerebrasTimeout = float(env_vars.get("CerebrasTimeout", "30"))
 
-# Initialize client with error handling
+# Spoken when the budget runs out before any answer arrived
+TimeoutAnswer = "Sorry, the search is taking too long. Please try again in a moment."
+
+# Initialize client with error handling (shared with ChatBot, on the keep-alive connection pool)
 client = None
 try:
-    from cerebras.cloud.sdk import Cerebras
-    client = Cerebras(api_key=CerebrasAPIKey)
+    client = CerebrasClient()
 except Exception as e:
     print(f"Warning: Cerebras client initialization failed: {e}")
     print("RealtimeSearchEngine will attempt to reinitialize on first use.")
@@ -23,22 +34,15 @@ System = f"""Hello, I am {Username}. You are a very accurate and advanced AI cha
 *** Provide Answers In a Professional Way, make sure to add full stops, commas, question marks, and use proper grammar.***
 *** Just answer the question from the provided data in a professional way. ***"""
 
-try:
-    with open(r"Data\ChatLog.json", "r") as f:
-        messages = load(f)
-except (FileNotFoundError, Exception):
-    if not os.path.exists("Data"):
-        os.makedirs("Data")
-    with open(r"Data\ChatLog.json", "w") as f:
-        dump([], f)
-        messages = []
-
-def GoogleSearch(query):
-    url = "https://google.serper.dev/search"
+# What prompts used to carry (the last 10 turns); memory reports its savings against it
+HistoryTurns = 10
+
+def GoogleSearch(query, timeout=SerperTimeout):
+    url = SerperURL
     headers = {'X-API-KEY': SerperAPIKey, 'Content-Type': 'application/json'}
     payload = {"q": query}
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = pool.post(url, headers=headers, json=payload, timeout=timeout)
         response.raise_for_status()
         results = response.json()
         Answer = f"The search results for '{query}' are:\n[start]\n"
@@ -69,47 +73,80 @@ def Information():
             f"Month: {now.strftime('%B')}\nYear: {now.strftime('%Y')}\n"
             f"Time: {now.strftime('%H')}:{now.strftime('%M')}:{now.strftime('%S')}\n")
 
-def RealtimeSearchEngine(prompt):
-    global SystemChatBot, messages, client
+def RealtimeSearchEngine(prompt, ctx=None, stream=None):
+    """stream (SentenceStream, optional) receives the answer as it streams; the caller closes it"""
+    global client
     
     try:
         # Reinitialize client if needed
         if client is None:
-            from cerebras.cloud.sdk import Cerebras
-            client = Cerebras(api_key=CerebrasAPIKey)
+            client = CerebrasClient()
         
-        with open(r"Data\ChatLog.json", "r") as f:
-            messages = load(f)
+        summary, messages = memory.context(prompt, HistoryTurns)
         messages.append({"role": "user", "content": prompt})
+        if summary:
+            messages.insert(0, {"role": "system", "content": summary})
         
-        SystemChatBot.append({"role": "system", "content": GoogleSearch(prompt)})
-
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b",
-            messages=SystemChatBot + [{"role": "system", "content": Information()}] + messages,
-            temperature=0.7,
-            max_tokens=2048,
-            top_p=1,
-            stream=True
-        )
-
-        Answer = ""
-        for chunk in completion:
-            if chunk.choices[0].delta.content:
-                Answer += chunk.choices[0].delta.content
+        search_start = time.time()
+        results = {"role": "system", "content": GoogleSearch(prompt, RemainingBudget(ctx, SerperTimeout))}
+        if ctx:
+            tracer.record(ctx.trace_id, "search.serper", search_start, time.time())
 
-        Answer = Answer.strip().replace("</s>", "")
-        messages.append({"role": "assistant", "content": Answer})
+        if ctx and ctx.cancelled:
+            return ""
+        if ctx and ctx.expired:
+            return TimeoutAnswer
 
-        with open(r"Data\ChatLog.json", "w") as f:
-            dump(messages, f, indent=4)
+        # No fallback here, but this path shares ChatBot's Cerebras breaker
+        breaker = health.breaker("cerebras")
+        if not breaker.allow():
+            print("⏭️ Cerebras circuit open")
+            raise CircuitOpen("circuit open")
+        request_start = time.time()
+        first_token = None
+        try:
+            completion = client.chat.completions.create(
+                model="llama-3.3-70b",
+                messages=SystemChatBot + [results, {"role": "system", "content": Information()}] + messages,
+                temperature=0.7,
+                max_tokens=2048,
+                top_p=1,
+                stream=True,
+                timeout=RemainingBudget(ctx, CerebrasTimeout)
+            )
+
+            Answer = ""
+            for chunk in completion:
+                if ctx and ctx.cancelled:
+                    completion.close()
+                    return ""
+                if ctx and ctx.expired:
+                    # Out of budget: answer with what has streamed so far
+                    completion.close()
+                    break
+                if chunk.choices[0].delta.content:
+                    if first_token is None:
+                        first_token = time.time()
+                    Answer += chunk.choices[0].delta.content
+                    if stream is not None:
+                        stream.feed(chunk.choices[0].delta.content.replace("</s>", ""))
+            if ctx and ctx.cancelled:
+                return ""
+            if not Answer and ctx and ctx.expired:
+                return TimeoutAnswer
+            if first_token is None:
+                raise Exception("empty answer")
+        except Exception as e:
+            breaker.failure(e)
+            raise
+        breaker.success(first_token - request_start)
+
+        Answer = Answer.strip().replace("</s>", "")
 
-        SystemChatBot.pop()
+        store.append_exchange(prompt, Answer)
         return AnswerModifier(Answer)
     
     except Exception as e:
-        if len(SystemChatBot) > 3:
-            SystemChatBot.pop()
         error_msg = f"Error in RealtimeSearchEngine: {str(e)}"
         print(error_msg)
         return "I encountered an error while searching. Please try again or check your API configuration."
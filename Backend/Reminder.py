@@ -0,0 +1,130 @@
+import os
+import re
+import json
+import threading
+from datetime import datetime, timedelta
+
+REMINDERS_FILE = os.path.join("Data", "Reminders.json")
+
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+TIME_PATTERN = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b", re.I)
+CLOCK_PATTERN = re.compile(r"\b(\d{1,2}):(\d{2})\b")
+DATE_PATTERN = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?", re.I)
+RELATIVE_PATTERN = re.compile(r"\bin\s+(\d+)\s*(second|sec|minute|min|hour|hr)s?\b", re.I)
+TOMORROW_PATTERN = re.compile(r"\btomorrow\b", re.I)
+
+RELATIVE_UNITS = {"second": 1, "sec": 1, "minute": 60, "min": 60, "hour": 3600, "hr": 3600}
+
+def ParseReminder(text, now=None):
+    """
+    Split a decision such as '11:00pm 5th aug dancing performance' into
+    (due datetime, message). Understands '5pm', '17:30', '5th aug',
+    'tomorrow' and 'in 10 minutes'; returns (None, text) without a time.
+    """
+    now = now or datetime.now()
+    message = text
+
+    relative = RELATIVE_PATTERN.search(text)
+    if relative:
+        seconds = int(relative.group(1)) * RELATIVE_UNITS[relative.group(2).lower()]
+        message = RELATIVE_PATTERN.sub("", message)
+        return now + timedelta(seconds=seconds), " ".join(message.split())
+
+    time_match = TIME_PATTERN.search(text)
+    if time_match:
+        hour, minute = int(time_match.group(1)) % 12, int(time_match.group(2) or 0)
+        if time_match.group(3).lower() == "pm":
+            hour += 12
+        message = TIME_PATTERN.sub("", message)
+    else:
+        time_match = CLOCK_PATTERN.search(text)
+        if not time_match:
+            return None, text
+        hour, minute = int(time_match.group(1)), int(time_match.group(2))
+        message = CLOCK_PATTERN.sub("", message)
+    if hour > 23 or minute > 59:
+        return None, text
+
+    due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    date_match = DATE_PATTERN.search(text)
+    if date_match:
+        try:
+            due = due.replace(month=MONTHS[date_match.group(2).lower()[:3]], day=int(date_match.group(1)))
+        except ValueError:
+            return None, text
+        if due < now:
+            due = due.replace(year=due.year + 1)
+        message = DATE_PATTERN.sub("", message)
+    elif TOMORROW_PATTERN.search(text):
+        due += timedelta(days=1)
+        message = TOMORROW_PATTERN.sub("", message)
+    elif due < now:
+        due += timedelta(days=1)
+
+    return due, " ".join(message.split())
+
+class ReminderScheduler:
+    """Reminders persisted in Data/Reminders.json and announced by a timer"""
+
+    def __init__(self, path=REMINDERS_FILE):
+        self.path = path
+        self.reminders = []
+        self.timers = {}
+        self.announce = print
+        self.lock = threading.Lock()
+
+    def start(self, announce=None):
+        """Load saved reminders and schedule them; overdue ones fire right away"""
+        if announce:
+            self.announce = announce
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            saved = []
+        for reminder in saved:
+            if reminder not in self.reminders:
+                self.schedule(reminder)
+
+    def add(self, due, message):
+        reminder = {"due": due.isoformat(timespec="seconds"), "message": message}
+        self.schedule(reminder)
+        return reminder
+
+    def schedule(self, reminder):
+        delay = (datetime.fromisoformat(reminder["due"]) - datetime.now()).total_seconds()
+        timer = threading.Timer(max(delay, 0), self.fire, args=(reminder,))
+        timer.daemon = True
+        with self.lock:
+            self.reminders.append(reminder)
+            self.timers[id(reminder)] = timer
+            self.save()
+        timer.start()
+
+    def fire(self, reminder):
+        with self.lock:
+            if reminder in self.reminders:
+                self.reminders.remove(reminder)
+            self.timers.pop(id(reminder), None)
+            self.save()
+        try:
+            self.announce(f"Reminder: {reminder['message']}")
+        except Exception as e:
+            print(f"[REMINDER]: Announce failed: {e}")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.reminders, f, indent=2)
+
+scheduler = ReminderScheduler()
+
+def SetReminder(text):
+    """Schedule a reminder from decision text"""
+    due, message = ParseReminder(text)
+    if due is None:
+        return f"I couldn't find a time in that reminder: {text}"
+    scheduler.add(due, message or text)
+    return f"Reminder set for {due.strftime('%I:%M %p on %A, %B %d')}: {message or text}"
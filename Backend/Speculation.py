@@ -0,0 +1,112 @@
+"""
+Speculative general answers.
+
+Most utterances are decided as a single 'general' task, so the core can
+start ChatBot while the decision model is still running. The answer is
+generated with save=False: nothing reaches the conversation store unless
+the decision confirms it and the speculation is committed. Otherwise it is
+cancelled and its streamed chunks are counted as wasted.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import dotenv_values
+from Backend.Capabilities import Chatbot
+from Backend.Handlers import registry
+from Backend.QueryContext import QueryContext
+from Backend.TaskExecutor import TaskJob
+from Backend.SpeechStream import SentenceStream, StreamSpeech
+
+env_vars = dotenv_values(".env")
+# Off by default: a speculation is a paid request whose answer may be thrown away
+SpeculativeChat = env_vars.get("SpeculativeChat", "0") == "1"
+
+class SpeculativeAnswer:
+    def __init__(self, speculator, query, ctx=None):
+        self.speculator = speculator
+        self.query = query
+        self.progress = {"chunks": 0}
+        self.settled = False
+
+        # Own context so it can be dropped without cancelling the query;
+        # shares the query's trace and deadline and dies with it
+        self.ctx = QueryContext(query)
+        if ctx:
+            self.ctx.trace_id = ctx.trace_id
+            self.ctx.deadline = ctx.deadline
+            ctx.on_cancel(lambda: self.ctx.cancel(ctx.reason))
+
+        # Sentences can be spoken as soon as the decision confirms the speculation
+        self.stream = SentenceStream(self.ctx) if StreamSpeech else None
+        self.future = speculator.pool.submit(Chatbot.ChatBot, query, self.ctx, save=False,
+                                             progress=self.progress, stream=self.stream)
+        if self.stream is not None:
+            self.future.add_done_callback(lambda f: self.stream.close())
+
+    def commit(self):
+        """Wait for the answer and write it to the chat log as if ChatBot had run normally"""
+        try:
+            answer = self.ctx.wait_future(self.future)
+        except Exception:
+            self.future.add_done_callback(lambda f: self.speculator.settle(self, committed=False))
+            raise
+        if answer and not self.ctx.cancelled:
+            Chatbot.SaveExchange(self.query, answer)
+            # Generated unsaved, so only cached once the decision confirmed it
+            if self.progress.get("complete"):
+                Chatbot.answers.put(self.query, answer)
+        self.speculator.settle(self, committed=True)
+        return answer
+
+    def cancel(self, reason="decision was not general"):
+        self.ctx.cancel(reason)
+        # Count the chunks streamed until the stream actually stopped
+        self.future.add_done_callback(lambda f: self.speculator.settle(self, committed=False))
+
+    def job(self):
+        """A TaskJob that commits this answer, scheduled like a 'general' task"""
+        handler = registry.handlers["general"]
+        return TaskJob(handler.name, self.commit, lane=handler.lane, timeout=handler.timeout,
+                       priority=handler.priority, stream=self.stream)
+
+class Speculator:
+    """Starts speculative answers and keeps the hit/waste counters"""
+
+    def __init__(self, enabled=SpeculativeChat, max_workers=2):
+        self.enabled = enabled
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prism-speculate")
+        self.lock = threading.Lock()
+        self.counts = {"started": 0, "committed": 0, "cancelled": 0,
+                       "committed_chunks": 0, "wasted_chunks": 0}
+
+    def start(self, query, ctx=None):
+        with self.lock:
+            self.counts["started"] += 1
+        return SpeculativeAnswer(self, query, ctx)
+
+    def settle(self, speculation, committed):
+        with self.lock:
+            if speculation.settled:
+                return
+            speculation.settled = True
+            chunks = speculation.progress.get("chunks", 0)
+            if committed:
+                self.counts["committed"] += 1
+                self.counts["committed_chunks"] += chunks
+            else:
+                self.counts["cancelled"] += 1
+                self.counts["wasted_chunks"] += chunks
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counts)
+        settled = stats["committed"] + stats["cancelled"]
+        stats["hit_rate"] = stats["committed"] / settled if settled else 0.0
+        return stats
+
+    def report(self):
+        stats = self.stats()
+        print(f"[SPECULATION]: {stats['committed']}/{stats['started']} committed ({stats['hit_rate']:.0%}), "
+              f"{stats['wasted_chunks']} chunks wasted, {stats['committed_chunks']} used")
+
+speculator = Speculator()
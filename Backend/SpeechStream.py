@@ -0,0 +1,138 @@
+"""
+Sentence-level streaming from the LLM to text-to-speech.
+
+ChatBot and RealtimeSearchEngine feed streamed tokens into a
+SentenceStream; the core starts speaking as soon as the first sentence is
+complete instead of after the last token. SentenceSplitter finds the
+boundaries: sentence-ending punctuation followed by whitespace, or a line
+break, without splitting after common abbreviations or on very short
+fragments such as list numbers.
+"""
+
+import re
+import threading
+from dotenv import dotenv_values
+from Backend.QueryContext import QueryCancelled
+
+env_vars = dotenv_values(".env")
+StreamSpeech = env_vars.get("StreamSpeech", "1") == "1"
+
+BOUNDARY = re.compile(r"[.!?]+[\"')\]]*(?=\s)|\n+")
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "st.", "vs.", "etc.", "e.g.", "i.e.", "approx.", "no."}
+# Shorter pieces are joined to the next sentence ("1." in a numbered list)
+MIN_SENTENCE_CHARS = 12
+# A sentence this long without punctuation is cut at a comma or space, so speech can start
+MAX_SENTENCE_CHARS = 220
+
+class SentenceSplitter:
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text):
+        """Add streamed text; return the sentences it completed"""
+        self.buffer += text
+        sentences, start = [], 0
+        for match in BOUNDARY.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+            words = candidate.split()
+            if len(candidate) < MIN_SENTENCE_CHARS or (words and words[-1].lower() in ABBREVIATIONS):
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+
+        if len(self.buffer) > MAX_SENTENCE_CHARS:
+            cut = self.buffer.rfind(", ", 0, MAX_SENTENCE_CHARS)
+            cut = cut + 1 if cut > 0 else self.buffer.rfind(" ", 0, MAX_SENTENCE_CHARS)
+            if cut > 0:
+                sentences.append(self.buffer[:cut].strip())
+                self.buffer = self.buffer[cut:]
+        return [s for s in sentences if s]
+
+    def close(self):
+        """Whatever is left once the stream has ended"""
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+class SentenceStream:
+    """
+    Sentences of one answer, written by the backend thread and read by the
+    speech thread while the answer is still being generated. Iteration
+    blocks for the next sentence, ends when the stream is closed (or the
+    query's budget plus grace runs out) and raises QueryCancelled if the
+    query is preempted.
+    """
+
+    def __init__(self, ctx=None):
+        self.ctx = ctx
+        self.splitter = SentenceSplitter()
+        self.sentences = []
+        self.closed = False
+        self.listeners = []
+        self.condition = threading.Condition()
+        if ctx:
+            ctx.on_cancel(self.wake)
+
+    @property
+    def started(self):
+        return bool(self.sentences)
+
+    def feed(self, text):
+        self.push(self.splitter.feed(text))
+
+    def push(self, sentences):
+        if not sentences:
+            return
+        with self.condition:
+            first = not self.sentences
+            self.sentences.extend(sentences)
+            self.condition.notify_all()
+            listeners = list(self.listeners) if first else []
+        for listener in listeners:
+            listener()
+
+    def close(self):
+        """End the stream, flushing the unfinished last sentence (idempotent)"""
+        with self.condition:
+            if self.closed:
+                return
+        self.push(self.splitter.close())
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def on_start(self, callback):
+        """Call callback once the first sentence is available (now if it already is)"""
+        with self.condition:
+            if not self.sentences:
+                self.listeners.append(callback)
+                return
+        callback()
+
+    def wake(self):
+        with self.condition:
+            self.condition.notify_all()
+
+    def text(self):
+        with self.condition:
+            return " ".join(self.sentences)
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self.condition:
+                limit = self.ctx.wait_limit() if self.ctx else None
+                self.condition.wait_for(
+                    lambda: index < len(self.sentences) or self.closed or (self.ctx and self.ctx.cancelled),
+                    limit)
+                if self.ctx and self.ctx.cancelled:
+                    raise QueryCancelled(self.ctx.reason)
+                if index >= len(self.sentences):
+                    # Closed, or out of time while the backend is stuck
+                    return
+                sentence = self.sentences[index]
+            index += 1
+            yield sentence
+
+    def __repr__(self):
+        return f"SentenceStream({len(self.sentences)} sentences{', closed' if self.closed else ''})"
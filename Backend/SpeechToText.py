@@ -10,6 +10,7 @@ import time
 import threading
 import socketserver
 from http.server import SimpleHTTPRequestHandler
+from Backend.TranscriptChannel import PublishUtterance
 
 env_vars = dotenv_values(".env")
 InputLanguage = env_vars.get("InputLanguage", "en-US")
@@ -157,12 +158,6 @@ driver.execute_script("startRecognition();")
 
 output_element = driver.find_element(By.ID, "output")
 
-VOICE_OUTPUT_FILE = "Data/VoiceInput.txt"
-
-if not os.path.exists(VOICE_OUTPUT_FILE):
-    with open(VOICE_OUTPUT_FILE, 'w') as f:
-        f.write("")
-
 def query_modifier(query):
     """Quick query formatting"""
     if not query or not query.strip():
@@ -187,6 +182,8 @@ print("PRISM Speech Recognition - OPTIMIZED MODE")
 print("Listening with faster response time...")
 
 last_text = ""
+speech_started = None
+speech_ended = None
 silence_counter = 0
 max_silence = 1.2  # Faster trigger (reduced from 2)
 
@@ -195,6 +192,9 @@ try:
         current_text = output_element.text.strip()
 
         if current_text != last_text and current_text:
+            if not last_text:
+                speech_started = time.time()
+            speech_ended = time.time()
             last_text = current_text
             silence_counter = 0
         else:
@@ -207,9 +207,11 @@ try:
                 if final and len(final) > 2:
                     print(f"[VOICE]: {final}")
                     
-                    # Write to file
-                    with open(VOICE_OUTPUT_FILE, 'w') as f:
-                        f.write(final)
+                    # Hand the utterance to the core
+                    try:
+                        PublishUtterance(final, speech_started, speech_ended)
+                    except Exception as e:
+                        print(f"[VOICE]: Could not deliver utterance: {e}")
                 
                 # Clear for next command
                 driver.execute_script("clearOutput();")
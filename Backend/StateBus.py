@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from dotenv import dotenv_values
+
+env_vars = dotenv_values(".env")
+
+# Mirror state into Frontend/Files/*.data for external readers (standalone GUI, scripts)
+StateFileMirror = env_vars.get("StateFileMirror", "1") == "1"
+
+# Typed channels: name -> (type, default value, mirror file)
+CHANNELS = {
+    "status": (str, "", "Frontend/Files/Status.data"),
+    "mic": (bool, True, "Frontend/Files/Mic.data"),
+    "transcript": (str, "", None),
+}
+
+class StateBus:
+    """
+    In-process publish/subscribe store for assistant state.
+
+    Every channel holds its latest value and a version number. Readers block on
+    a condition variable instead of polling, and callbacks fire on every change.
+    """
+
+    def __init__(self, mirror=StateFileMirror):
+        self.mirror = mirror
+        self.condition = threading.Condition()
+        self.values = {name: spec[1] for name, spec in CHANNELS.items()}
+        self.versions = {name: 0 for name in CHANNELS}
+        self.subscribers = {name: [] for name in CHANNELS}
+        # Version last written to each mirror file; older publishes are skipped
+        self.mirror_lock = threading.Lock()
+        self.mirrored = {name: 0 for name in CHANNELS}
+
+        if self.mirror:
+            os.makedirs("Frontend/Files", exist_ok=True)
+
+    def publish(self, channel, value):
+        """Set a channel value and wake every waiter. Returns the new version."""
+        value_type = CHANNELS[channel][0]
+        value = value_type(value)
+
+        with self.condition:
+            if self.values[channel] == value and self.versions[channel]:
+                return self.versions[channel]
+            self.values[channel] = value
+            self.versions[channel] += 1
+            version = self.versions[channel]
+            callbacks = list(self.subscribers[channel])
+            self.condition.notify_all()
+
+        if self.mirror:
+            self.write_mirror(channel, value, version)
+
+        for callback in callbacks:
+            try:
+                callback(value)
+            except Exception as e:
+                print(f"[BUS]: Subscriber error on '{channel}': {e}")
+
+        return version
+
+    def get(self, channel):
+        with self.condition:
+            return self.values[channel]
+
+    def version(self, channel):
+        with self.condition:
+            return self.versions[channel]
+
+    def wait_for_change(self, channel, last_version, timeout=None):
+        """
+        Block until the channel version differs from last_version.
+
+        Returns (value, version); the version is unchanged on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while self.versions[channel] == last_version:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            return self.values[channel], self.versions[channel]
+
+    def wait_for(self, channel, value, timeout=None):
+        """Block until the channel holds the given value. Returns True if it does."""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.values[channel] == value, timeout)
+
+    def subscribe(self, channel, callback):
+        """Call callback(value) on every change of the channel."""
+        with self.condition:
+            self.subscribers[channel].append(callback)
+
+    def unsubscribe(self, channel, callback):
+        with self.condition:
+            if callback in self.subscribers[channel]:
+                self.subscribers[channel].remove(callback)
+
+    def write_mirror(self, channel, value, version):
+        """Write a channel's mirror file unless a newer version was already written"""
+        file_path = CHANNELS[channel][2]
+        if not file_path:
+            return
+        with self.mirror_lock:
+            # Concurrent publishes can get here out of order
+            if version <= self.mirrored[channel]:
+                return
+            try:
+                if isinstance(value, bool):
+                    value = '1' if value else '0'
+                with open(file_path, 'w') as f:
+                    f.write(str(value))
+                self.mirrored[channel] = version
+            except Exception as e:
+                print(f"[BUS]: Mirror write failed for '{channel}': {e}")
+
+# Shared bus for the core, backends and GUIs running in this process
+bus = StateBus()
@@ -0,0 +1,215 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import dotenv_values
+from Backend.QueryContext import QueryCancelled
+from Backend.Tracer import tracer
+
+env_vars = dotenv_values(".env")
+TaskWorkers = int(env_vars.get("TaskWorkers", "4"))
+# Yield quicker jobs' results first (instant automation before LLM answers)
+ReorderResults = env_vars.get("ReorderResults", "1") == "1"
+
+class TaskTimeout(Exception):
+    """A job did not finish within its handler's timeout"""
+
+class TaskJob:
+    """
+    One task from a decision, ready to run.
+
+    parallel_safe=False makes the job a barrier: it waits for every earlier
+    job and every later job waits for it. Jobs sharing a lane run one after
+    another (e.g. both writers of the chat log) but overlap with other lanes.
+    timeout bounds how long the core waits for the result (the job itself is
+    left to finish); priority is the handler's cost class, lower is quicker.
+    stream is the SentenceStream the job feeds its answer into, if any.
+    """
+
+    def __init__(self, name, func, args=(), kwargs=None, parallel_safe=True, lane=None,
+                 timeout=None, priority=1, stream=None):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.parallel_safe = parallel_safe
+        self.lane = lane
+        self.timeout = timeout
+        self.priority = priority
+        self.stream = stream
+
+    def __repr__(self):
+        return f"TaskJob({self.name!r})"
+
+class TaskBatch:
+    """
+    Jobs of one query: scheduled concurrently, results yielded by priority.
+
+    Jobs can keep arriving while results are consumed (tasks streamed from
+    the decision model); results() ends once close() has been called.
+
+    With reorder, the next result is the quickest-class job (lowest
+    priority, then submission order), so "open chrome" is spoken while a
+    general answer is still generating. Jobs never move across a barrier.
+    """
+
+    def __init__(self, executor, ctx=None, reorder=ReorderResults):
+        self.executor = executor
+        self.ctx = ctx
+        self.reorder = reorder
+        self.jobs = []
+        self.futures = []
+        self.lane_tails = {}
+        self.barrier = None
+        self.closed = False
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        if ctx:
+            ctx.on_cancel(self.wake)
+
+    def add(self, job):
+        """Schedule a job behind its dependencies and return its future"""
+        with self.lock:
+            if not job.parallel_safe:
+                deps = list(self.futures)
+            else:
+                deps = [f for f in (self.barrier, self.lane_tails.get(job.lane)) if f]
+
+            future = self.executor.pool.submit(self.run_job, job, deps, self.ctx)
+
+            if not job.parallel_safe:
+                self.barrier = future
+            if job.lane:
+                self.lane_tails[job.lane] = future
+            self.jobs.append(job)
+            self.futures.append(future)
+            self.changed.notify_all()
+        # Outside the lock: the callback runs right away if the job already finished
+        future.add_done_callback(lambda f: self.wake())
+        if job.stream is not None:
+            job.stream.on_start(self.wake)
+        return future
+
+    def close(self):
+        """No more jobs will be added"""
+        with self.lock:
+            self.closed = True
+            self.changed.notify_all()
+
+    def wake(self):
+        with self.lock:
+            self.changed.notify_all()
+
+    @staticmethod
+    def run_job(job, deps, ctx):
+        try:
+            # Dependencies were submitted earlier, so they are already running or done
+            for dep in deps:
+                try:
+                    dep.result()
+                except Exception:
+                    pass
+            # Don't start work for a query that was preempted while this job waited
+            if ctx:
+                ctx.check()
+                with tracer.span(ctx.trace_id, f"handler.{job.name}"):
+                    return job.func(*job.args, **job.kwargs)
+            return job.func(*job.args, **job.kwargs)
+        finally:
+            # Whatever happened, the reader of the stream must not wait for more
+            if job.stream is not None:
+                job.stream.close()
+
+    def choose(self, pending):
+        """Index of the job whose result comes next"""
+        if not self.reorder:
+            return pending[0]
+        candidates = []
+        for index in pending:
+            if not self.jobs[index].parallel_safe:
+                # A barrier goes out in place: after everything before it, before everything after
+                if not candidates:
+                    return index
+                break
+            candidates.append(index)
+        return min(candidates, key=lambda index: (self.jobs[index].priority, index))
+
+    @staticmethod
+    def streaming(job):
+        return job.stream is not None and job.stream.started
+
+    def wait_limit(self, job, since):
+        """Seconds left to wait for a job first waited on at since (None = no limit)"""
+        remaining = None if job.timeout is None else job.timeout - (time.time() - since)
+        return self.ctx.wait_limit(remaining) if self.ctx else remaining
+
+    def results(self):
+        """
+        Yield (job, result, error) as each job finishes, in priority order
+        (submission order without reorder). A job past its timeout yields a
+        TaskTimeout error; its clock starts when its result is next in line.
+        A job with a stream is yielded as soon as its first sentence is ready,
+        with the SentenceStream as its result.
+
+        With a ctx, raises QueryCancelled as soon as the query is preempted;
+        jobs still running finish in the background and are discarded.
+        """
+        pending = []
+        seen = 0
+        since = {}
+        while True:
+            with self.lock:
+                while True:
+                    pending.extend(range(seen, len(self.futures)))
+                    seen = len(self.futures)
+                    if self.ctx and self.ctx.cancelled:
+                        raise QueryCancelled(self.ctx.reason)
+                    if not pending:
+                        # Wait for the next job unless the batch is complete
+                        if self.closed:
+                            return
+                        self.changed.wait()
+                        continue
+                    # Chosen again on every wake-up: a quicker job may have arrived
+                    index = self.choose(pending)
+                    job, future = self.jobs[index], self.futures[index]
+                    limit = self.wait_limit(job, since.setdefault(index, time.time()))
+                    if future.done() or self.streaming(job) or (limit is not None and limit <= 0):
+                        break
+                    self.changed.wait(limit)
+                pending.remove(index)
+
+            if self.streaming(job):
+                yield job, job.stream, None
+                continue
+            if not future.done():
+                yield job, None, TaskTimeout("no result in time")
+                continue
+            try:
+                result = future.result()
+            except QueryCancelled:
+                raise
+            except Exception as e:
+                # Includes a TimeoutError raised by the job itself
+                yield job, None, e
+            else:
+                yield job, result, None
+
+class TaskExecutor:
+    """Thread pool shared by every query"""
+
+    def __init__(self, max_workers=TaskWorkers):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prism-task")
+
+    def batch(self, ctx=None):
+        return TaskBatch(self, ctx)
+
+    def run(self, jobs, ctx=None):
+        """Schedule all jobs at once and yield their results (see TaskBatch.results)"""
+        batch = self.batch(ctx)
+        for job in jobs:
+            batch.add(job)
+        batch.close()
+        return batch.results()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
@@ -0,0 +1,136 @@
+"""
+Optimization pass between the decision and execution.
+
+The decision model's comma-separated output often repeats itself
+("open chrome, open chrome") or spells out single volume steps
+("system volume up, system volume up"). TaskPlan drops duplicates and
+folds every volume step of a decision into one net adjustment. Complete
+task lists are also reordered so instant automation is scheduled before
+slow LLM, search and image tasks; streamed decisions are passed through
+in arrival order and the executor yields the quicker results first.
+"""
+
+import threading
+from Backend.Handlers import registry, PRIORITY_FAST
+from Backend.CommandQueue import NormalizeCommand
+
+# Net effect of one step of each volume task
+VOLUME_STEPS = {"system volume up": 1, "system volume down": -1}
+
+def VolumeSteps(task):
+    """Signed number of volume steps a task stands for, or None if it is not a volume task"""
+    handler, argument = registry.dispatch(task)
+    if handler is None or handler.prefix not in VOLUME_STEPS:
+        return None
+    count = int(argument) if argument.isdigit() else 1
+    return VOLUME_STEPS[handler.prefix] * count
+
+def VolumeTask(steps):
+    """The single task for a net volume change (None when the steps cancel out)"""
+    if not steps:
+        return None
+    task = "system volume up" if steps > 0 else "system volume down"
+    return task if abs(steps) == 1 else f"{task} {abs(steps)}"
+
+def OrderTasks(tasks):
+    """
+    Stable sort by handler priority (instant automation first). Tasks never
+    move across a barrier such as exit, which must stay where it was said.
+    """
+    ordered, segment = [], []
+    for task in tasks:
+        handler = registry.dispatch(task)[0]
+        if handler and not handler.parallel_safe:
+            ordered += sorted(segment, key=TaskPriority) + [task]
+            segment = []
+        else:
+            segment.append(task)
+    return ordered + sorted(segment, key=TaskPriority)
+
+def TaskPriority(task):
+    handler = registry.dispatch(task)[0]
+    return handler.priority if handler else PRIORITY_FAST
+
+class TaskPlan:
+    """
+    Optimizes one decision's tasks as they arrive. add() returns the tasks
+    that can run now; volume steps are held until close() so they are
+    applied as one adjustment.
+    """
+
+    def __init__(self, optimizer=None):
+        self.optimizer = optimizer
+        self.seen = set()
+        self.volume = 0
+        self.volume_tasks = 0
+
+    def add(self, task):
+        steps = VolumeSteps(task)
+        if steps is not None:
+            self.volume += steps
+            self.volume_tasks += 1
+            return []
+        key = NormalizeCommand(task)
+        if key in self.seen:
+            self.count("deduplicated")
+            return []
+        self.seen.add(key)
+        handler = registry.dispatch(task)[0]
+        if handler and not handler.parallel_safe:
+            # Volume steps said before a barrier (e.g. exit) are applied before it
+            return self.close() + [task]
+        return [task]
+
+    def close(self):
+        """The merged volume adjustment, if any; starts a new one"""
+        task = VolumeTask(self.volume)
+        if self.volume_tasks > 1:
+            self.count("merged", self.volume_tasks - (1 if task else 0))
+        self.volume = self.volume_tasks = 0
+        return [task] if task else []
+
+    def stream(self, tasks):
+        """Optimized tasks from an iterable; a complete list is also reordered"""
+        if isinstance(tasks, list):
+            planned = [t for task in tasks for t in self.add(task)] + self.close()
+            ordered = OrderTasks(planned)
+            if ordered != planned:
+                self.count("reordered")
+            yield from ordered
+            return
+        for task in tasks:
+            yield from self.add(task)
+        yield from self.close()
+
+    def count(self, key, amount=1):
+        if self.optimizer:
+            self.optimizer.count(key, amount)
+
+class TaskOptimizer:
+    """Creates a TaskPlan per decision and keeps the optimization counters"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {"deduplicated": 0, "merged": 0, "reordered": 0}
+
+    def plan(self):
+        return TaskPlan(self)
+
+    def optimize(self, tasks):
+        """Optimize a complete task list"""
+        return list(self.plan().stream(list(tasks)))
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def report(self):
+        stats = self.stats()
+        print(f"[TASK OPTIMIZER]: {stats['deduplicated']} duplicates dropped, {stats['merged']} volume steps merged, "
+              f"{stats['reordered']} decisions reordered")
+
+optimizer = TaskOptimizer()
@@ -1,7 +1,7 @@
 import pyttsx3
 from dotenv import dotenv_values
 import threading
-import os
+from Backend.StateBus import bus
 
 env_vars = dotenv_values(".env")
 VoiceRate = int(env_vars.get("VoiceRate", "190"))  # Faster default (was 180)
@@ -34,25 +34,13 @@ engine.setProperty('volume', VoiceVolume)
 # Thread lock
 engine_lock = threading.Lock()
 
-# File paths for mic control
-MIC_FILE = "Frontend/Files/Mic.data"
-
 def disable_mic():
     """Disable microphone before speaking"""
-    try:
-        os.makedirs("Frontend/Files", exist_ok=True)
-        with open(MIC_FILE, 'w') as f:
-            f.write('0')
-    except:
-        pass
+    bus.publish('mic', False)
 
 def enable_mic():
     """Re-enable microphone after speaking"""
-    try:
-        with open(MIC_FILE, 'w') as f:
-            f.write('1')
-    except:
-        pass
+    bus.publish('mic', True)
 
 def Speak(Text):
     """Optimized speech with mic control"""
@@ -111,6 +99,38 @@ def SpeakWithoutPrint(Text):
         enable_mic()
         return False
 
+def SpeakStream(Sentences, on_sentence=None):
+    """
+    Speak sentences as they arrive from a SentenceStream (or any iterable).
+    The mic stays off until the last one, so the assistant never hears itself
+    between sentences. on_sentence(sentence) runs just before each is spoken.
+    """
+    spoken = False
+    disable_mic()
+    try:
+        for Sentence in Sentences:
+            Sentence = Sentence.replace("P.R.I.S.M", "Prism").replace("PRISM", "Prism")
+            if not Sentence.strip():
+                continue
+            if on_sentence:
+                on_sentence(Sentence)
+            with engine_lock:
+                engine.say(Sentence)
+                engine.runAndWait()
+            spoken = True
+    finally:
+        import time
+        time.sleep(0.2)
+        enable_mic()
+    return spoken
+
+def StopSpeaking():
+    """Interrupt the utterance currently being spoken (called from another thread)"""
+    try:
+        engine.stop()
+    except Exception as e:
+        print(f"TTS Stop Error: {e}")
+
 def SpeakAsync(Text):
     """Non-blocking speech"""
     thread = threading.Thread(target=Speak, args=(Text,), daemon=True)
@@ -0,0 +1,113 @@
+import os
+import sys
+import math
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+
+TRACE_FILE = os.path.join("Data", "Trace.jsonl")
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+def NewTraceId():
+    return uuid.uuid4().hex[:12]
+
+def Percentile(values, p):
+    """Nearest-rank percentile of a list of numbers (p in 0..100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+class Tracer:
+    """
+    Span recorder keyed by one correlation id per utterance.
+
+    Disabled by default; Main.py --profile enables it. Every span is appended
+    to Data/Trace.jsonl and kept in memory for the p50/p95/p99 report.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = TRACE_FILE
+        self.durations = {}
+        self.lock = threading.Lock()
+
+    def enable(self, path=TRACE_FILE):
+        self.enabled = True
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def record(self, trace_id, stage, start, end, **fields):
+        """Record a span from wall-clock timestamps (time.time())"""
+        if not self.enabled or start is None or end is None:
+            return
+        duration_ms = max(0.0, (end - start) * 1000)
+        entry = {"trace": trace_id, "stage": stage, "start": round(start, 4),
+                 "duration_ms": round(duration_ms, 2)}
+        entry.update(fields)
+        with self.lock:
+            self.durations.setdefault(stage, []).append(duration_ms)
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except Exception as e:
+                print(f"[TRACE]: Write failed: {e}")
+
+    @contextmanager
+    def span(self, trace_id, stage, **fields):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(trace_id, stage, start, time.time(), **fields)
+
+    def load(self, path=TRACE_FILE):
+        """Read durations back from a trace file"""
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.durations.setdefault(entry["stage"], []).append(entry["duration_ms"])
+
+    def summary(self):
+        """Per-stage count and percentiles in milliseconds"""
+        with self.lock:
+            return {stage: {"count": len(values),
+                            "p50": Percentile(values, 50),
+                            "p95": Percentile(values, 95),
+                            "p99": Percentile(values, 99)}
+                    for stage, values in sorted(self.durations.items())}
+
+    def report(self):
+        summary = self.summary()
+        if not summary:
+            print("[TRACE]: No spans recorded.")
+            return
+        print("\n" + "=" * 70)
+        print(f"{'Stage':<28}{'n':>6}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+        print("-" * 70)
+        for stage, stats in summary.items():
+            print(f"{stage:<28}{stats['count']:>6}{stats['p50']:>12.1f}{stats['p95']:>12.1f}{stats['p99']:>12.1f}")
+        print("=" * 70)
+        for stage, values in sorted(self.durations.items()):
+            print(f"\n{stage}")
+            counts = [0] * (len(BUCKETS) + 1)
+            for value in values:
+                counts[next((i for i, b in enumerate(BUCKETS) if value <= b), len(BUCKETS))] += 1
+            widest = max(counts)
+            for i, count in enumerate(counts):
+                if count:
+                    label = f"<= {BUCKETS[i]} ms" if i < len(BUCKETS) else f"> {BUCKETS[-1]} ms"
+                    print(f"  {label:>12} | {'#' * max(1, round(40 * count / widest))} {count}")
+
+# Shared tracer for this process
+tracer = Tracer()
+
+if __name__ == "__main__":
+    tracer.load(sys.argv[1] if len(sys.argv) > 1 else TRACE_FILE)
+    tracer.report()
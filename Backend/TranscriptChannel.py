@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import socket
+import threading
+import socketserver
+from collections import deque
+from dotenv import dotenv_values
+
+env_vars = dotenv_values(".env")
+TranscriptPort = int(env_vars.get("TranscriptPort", "8001"))
+TranscriptCapacity = int(env_vars.get("TranscriptCapacity", "64"))
+
+# Unix-domain socket where available, loopback TCP otherwise (Windows)
+SOCKET_PATH = os.path.join("Data", "Transcript.sock")
+USE_UNIX_SOCKET = hasattr(socket, "AF_UNIX") and os.name != 'nt'
+
+class UtteranceRecord:
+    """One final utterance from speech recognition"""
+
+    def __init__(self, seq, text, started, ended, speech_ended=None):
+        self.seq = seq
+        self.text = text
+        self.started = started
+        self.ended = ended
+        # Last change of the transcript; ended - speech_ended is endpointing delay
+        self.speech_ended = speech_ended or ended
+
+    def to_dict(self):
+        return {"seq": self.seq, "text": self.text, "started": self.started,
+                "ended": self.ended, "speech_ended": self.speech_ended}
+
+    def __repr__(self):
+        return f"UtteranceRecord(seq={self.seq}, text={self.text!r})"
+
+class TranscriptChannel:
+    """
+    Sequenced ring buffer of utterance records.
+
+    Every record gets a monotonically increasing sequence number. A consumer
+    keeps the last sequence it handled and asks for the next one, so each
+    utterance is delivered exactly once, including genuine repeats.
+    """
+
+    def __init__(self, capacity=TranscriptCapacity):
+        self.records = deque(maxlen=capacity)
+        self.condition = threading.Condition()
+        self.last_seq = 0
+        self.dropped = 0
+        # The consumer reads this process's channel (set by the core whether or not the socket is up)
+        self.local = False
+        self.serving = False
+
+    def put(self, text, started=None, ended=None, speech_ended=None):
+        """Append an utterance and wake the consumer. Returns the record."""
+        ended = ended or time.time()
+        with self.condition:
+            self.last_seq += 1
+            record = UtteranceRecord(self.last_seq, text, started or ended, ended, speech_ended)
+            self.records.append(record)
+            self.condition.notify_all()
+        return record
+
+    def get(self, after_seq, timeout=None):
+        """Return the first record with seq > after_seq, or None on timeout."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.last_seq > after_seq, timeout):
+                return None
+            oldest = self.records[0].seq
+            if after_seq + 1 < oldest:
+                # Consumer fell further behind than the ring holds
+                self.dropped += oldest - after_seq - 1
+                print(f"[TRANSCRIPT]: {oldest - after_seq - 1} utterance(s) overwritten")
+            for record in self.records:
+                if record.seq > after_seq:
+                    return record
+
+class TranscriptServer:
+    """Accepts utterances from an out-of-process recognizer and sequences them"""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.server = None
+
+    def start(self):
+        channel = self.channel
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        data = json.loads(line)
+                        record = channel.put(data["text"], data.get("started"), data.get("ended"),
+                                             data.get("speech_ended"))
+                        self.wfile.write((json.dumps({"seq": record.seq}) + "\n").encode())
+                    except Exception as e:
+                        print(f"[TRANSCRIPT]: Bad record: {e}")
+
+        try:
+            if USE_UNIX_SOCKET:
+                if os.path.exists(SOCKET_PATH):
+                    os.remove(SOCKET_PATH)
+                self.server = socketserver.ThreadingUnixStreamServer(SOCKET_PATH, Handler)
+            else:
+                socketserver.ThreadingTCPServer.allow_reuse_address = True
+                self.server = socketserver.ThreadingTCPServer(("127.0.0.1", TranscriptPort), Handler)
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+            channel.serving = True
+        except Exception as e:
+            print(f"[TRANSCRIPT]: Socket server unavailable, in-process only: {e}")
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.channel.serving = False
+
+class TranscriptClient:
+    """Sends utterances to the core's TranscriptServer"""
+
+    def __init__(self):
+        self.sock = None
+        self.reader = None
+
+    def connect(self):
+        if USE_UNIX_SOCKET:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(SOCKET_PATH)
+        else:
+            self.sock = socket.create_connection(("127.0.0.1", TranscriptPort))
+        self.reader = self.sock.makefile('rb')
+
+    def send(self, text, started=None, ended=None, speech_ended=None):
+        """Send one utterance and return the sequence number it was given"""
+        payload = {"text": text, "started": started, "ended": ended or time.time(),
+                   "speech_ended": speech_ended}
+        data = (json.dumps(payload) + "\n").encode()
+        try:
+            if self.sock is None:
+                self.connect()
+            self.sock.sendall(data)
+        except OSError:
+            # Stale connection, nothing was delivered: reconnect once
+            self.close()
+            self.connect()
+            self.sock.sendall(data)
+        return json.loads(self.reader.readline())["seq"]
+
+    def close(self):
+        if self.sock:
+            try:
+                self.sock.close()
+            except Exception:
+                pass
+        self.sock = None
+        self.reader = None
+
+# Shared channel for this process
+channel = TranscriptChannel()
+_client = None
+
+def PublishUtterance(text, started=None, speech_ended=None):
+    """Deliver a final utterance to the core: in-process when it runs here, otherwise over the socket"""
+    global _client
+    if channel.local:
+        return channel.put(text, started, speech_ended=speech_ended).seq
+    if _client is None:
+        _client = TranscriptClient()
+    return _client.send(text, started, speech_ended=speech_ended)
@@ -0,0 +1,262 @@
+"""
+Accuracy and latency evaluation for the decision layer.
+
+Runs a labelled utterance corpus through one or more decision backends and
+reports exact-match accuracy, per task type precision/recall, the
+general/realtime confusion matrix and latency percentiles, so changes to
+the preamble, ChatHistory or the local classifiers can be judged on data.
+
+Backends:
+    rules    keyword fast path (IntentMatcher); abstains below its threshold
+    intent   nearest-neighbour intent model, 2-fold: trained on one half of
+             the corpus, evaluated on the other
+    cohere   the decision model alone (Model.ModelDecision)
+    batch    the decision model deciding --batch-size utterances per call
+             (Model.ModelBatch); per-utterance latency is the call's share
+    cache    decision cache lookups; abstains on misses
+    routed   the full FirstLayerDMM path: fast path, cache, intent model, Cohere
+
+Backends run in the given order and share state: 'cache' and 'routed' see
+the decisions that 'cohere' stored before them. By default Cohere is the
+stand-in server answering from the corpus (its optional "model" field
+replays a recorded answer instead of the label); --live uses the real API
+from the repository's .env.
+
+    python Benchmarks/EvaluateDecisions.py
+    python Benchmarks/EvaluateDecisions.py --backends rules,intent
+    python Benchmarks/EvaluateDecisions.py --live --backends cohere
+    python Benchmarks/EvaluateDecisions.py --data Data --backends cache,intent
+
+Results are written to Benchmarks/Results/ as JSON.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "Results")
+
+sys.path.insert(0, REPO_ROOT)
+from Benchmarks.StandInServers import StandInServers
+from Benchmarks.RunBenchmark import parse_overrides, git_commit
+
+BACKENDS = ("rules", "intent", "cohere", "batch", "cache", "routed")
+QUERY_TYPES = ("general", "realtime")
+
+def SplitDecision(decision):
+    return [task.strip() for task in decision.split(",") if task.strip()]
+
+def NormalizeTask(task):
+    """'General How are you?' and 'general how are you' compare equal"""
+    return " ".join(re.sub(r"[^\w\s']", " ", task.lower()).split())
+
+def TaskType(task):
+    from Backend.Handlers import registry
+    handler = registry.dispatch(task)[0]
+    return handler.name if handler else (task.split() or [""])[0]
+
+def QueryType(tasks):
+    """'general'/'realtime' for single query decisions, 'other' otherwise, None for abstentions"""
+    if tasks is None:
+        return None
+    types = [TaskType(task) for task in tasks]
+    return types[0] if len(types) == 1 and types[0] in QUERY_TYPES else "other"
+
+def timed(decide, utterance):
+    start = time.perf_counter()
+    tasks = decide(utterance)
+    return tasks, (time.perf_counter() - start) * 1000
+
+def evaluate_rules(corpus, Model):
+    def decide(utterance):
+        tasks, confidence = Model.matcher.classify(utterance)
+        return tasks if tasks and confidence >= Model.matcher.threshold else None
+    return [timed(decide, item["utterance"]) for item in corpus]
+
+def evaluate_intent(corpus, Model, workdir):
+    from Backend.IntentModel import IntentModel
+    if not Model.intent_model.available:
+        print("[EVAL]: numpy is not installed, skipping the intent model")
+        return None
+    outputs = [None] * len(corpus)
+    for fold in range(2):
+        model = IntentModel(path=os.path.join(workdir, "IntentEval", str(fold))).load(seed=Model.SEED_DECISIONS)
+        model.add_many((item["utterance"], SplitDecision(item["decision"]))
+                       for i, item in enumerate(corpus) if i % 2 != fold)
+        for i, item in enumerate(corpus):
+            if i % 2 == fold:
+                outputs[i] = timed(lambda utterance: model.classify(utterance)[0], item["utterance"])
+    return outputs
+
+def evaluate_cohere(corpus, Model):
+    return [timed(lambda utterance: list(Model.ModelDecision(utterance)), item["utterance"]) for item in corpus]
+
+def evaluate_batch(corpus, Model, size):
+    outputs = []
+    for start in range(0, len(corpus), size):
+        prompts = [item["utterance"] for item in corpus[start:start + size]]
+        decisions, ms = timed(Model.ModelBatch, prompts)
+        outputs += [(tasks, ms / len(prompts)) for tasks in decisions]
+    return outputs
+
+def evaluate_cache(corpus, Model):
+    return [timed(Model.cache.get, item["utterance"]) for item in corpus]
+
+def evaluate_routed(corpus, Model):
+    return [timed(Model.FirstLayerDMM, item["utterance"]) for item in corpus]
+
+def score(corpus, outputs):
+    from Backend.Tracer import Percentile
+    answered = correct = 0
+    types = {}
+    confusion = {expected: {} for expected in QUERY_TYPES}
+    latencies = []
+    mistakes = []
+
+    for item, (tasks, ms) in zip(corpus, outputs):
+        latencies.append(ms)
+        expected = SplitDecision(item["decision"])
+        expected_type = QueryType(expected)
+        if expected_type in QUERY_TYPES:
+            predicted_type = QueryType(tasks) or "abstain"
+            row = confusion[expected_type]
+            row[predicted_type] = row.get(predicted_type, 0) + 1
+        if tasks is None:
+            continue
+
+        answered += 1
+        if [NormalizeTask(t) for t in tasks] == [NormalizeTask(t) for t in expected]:
+            correct += 1
+        else:
+            mistakes.append({"utterance": item["utterance"], "expected": expected, "predicted": tasks})
+
+        expected_types = [TaskType(t) for t in expected]
+        predicted_types = [TaskType(t) for t in tasks]
+        for name in set(expected_types) | set(predicted_types):
+            counts = types.setdefault(name, {"support": 0, "predicted": 0, "correct": 0})
+            counts["support"] += expected_types.count(name)
+            counts["predicted"] += predicted_types.count(name)
+            counts["correct"] += min(expected_types.count(name), predicted_types.count(name))
+
+    for counts in types.values():
+        counts["precision"] = counts["correct"] / counts["predicted"] if counts["predicted"] else 0.0
+        counts["recall"] = counts["correct"] / counts["support"] if counts["support"] else 0.0
+
+    return {
+        "count": len(outputs),
+        "answered": answered,
+        "coverage": answered / len(outputs) if outputs else 0.0,
+        "accuracy": correct / answered if answered else 0.0,
+        "types": dict(sorted(types.items())),
+        "confusion": confusion,
+        "latency_ms": {
+            "p50": Percentile(latencies, 50),
+            "p95": Percentile(latencies, 95),
+            "p99": Percentile(latencies, 99),
+        },
+        "mistakes": mistakes,
+    }
+
+def report(backend, result, verbose):
+    latency = result["latency_ms"]
+    print(f"\n== {backend}: accuracy {result['accuracy']:.1%} on {result['answered']}/{result['count']} answered "
+          f"(coverage {result['coverage']:.0%}) | p50 {latency['p50']:.2f} ms p95 {latency['p95']:.2f} ms "
+          f"p99 {latency['p99']:.2f} ms")
+    if result["types"]:
+        print(f"{'Type':<18}{'support':>9}{'precision':>11}{'recall':>9}")
+        for name, counts in result["types"].items():
+            print(f"{name:<18}{counts['support']:>9}{counts['precision']:>11.0%}{counts['recall']:>9.0%}")
+    columns = QUERY_TYPES + ("other", "abstain")
+    print("general/realtime confusion (rows expected, columns predicted)")
+    print(f"{'':<10}" + "".join(f"{c:>10}" for c in columns))
+    for expected, row in result["confusion"].items():
+        print(f"{expected:<10}" + "".join(f"{row.get(c, 0):>10}" for c in columns))
+    if verbose:
+        for mistake in result["mistakes"]:
+            print(f"  ✗ {mistake['utterance']!r}: expected {mistake['expected']}, got {mistake['predicted']}")
+
+def main():
+    parser = argparse.ArgumentParser(description='P.R.I.S.M decision layer evaluation')
+    parser.add_argument('--corpus', default=os.path.join(BENCH_DIR, "Corpus", "decisions.json"))
+    parser.add_argument('--backends', default="rules,intent,cohere,cache",
+                        help=f'Comma-separated, run in order: {", ".join(BACKENDS)}')
+    parser.add_argument('--batch-size', type=int, default=4, help='Utterances per call for the batch backend')
+    parser.add_argument('--live', action='store_true', help="Use the real Cohere API from the repository's .env")
+    parser.add_argument('--data', help='Data directory to start from (decision cache, intent model)')
+    parser.add_argument('--set', dest='overrides', action='append', default=[],
+                        help='Stand-in setting, e.g. cohere.latency=0.8')
+    parser.add_argument('--verbose', action='store_true', help='List every wrong decision')
+    parser.add_argument('--output', help='Result file (default Benchmarks/Results/decisions-<time>.json)')
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+
+    with open(args.corpus, "r") as f:
+        corpus = json.load(f)
+
+    # Throwaway working directory so evaluation never touches the real
+    # decision cache or intent model
+    workdir = tempfile.mkdtemp(prefix="prism-eval-")
+    if args.data:
+        shutil.copytree(args.data, os.path.join(workdir, "Data"))
+    servers = None
+    if args.live:
+        shutil.copy(os.path.join(REPO_ROOT, ".env"), os.path.join(workdir, ".env"))
+    else:
+        decisions = {item["utterance"]: item.get("model", item["decision"]) for item in corpus}
+        servers = StandInServers(parse_overrides(args.overrides), decisions).start()
+        with open(os.path.join(workdir, ".env"), "w") as f:
+            for key, value in servers.env().items():
+                f.write(f"{key}={value}\n")
+    os.chdir(workdir)
+
+    import Backend.Capabilities
+    from Backend import Model
+
+    evaluators = {
+        "rules": lambda: evaluate_rules(corpus, Model),
+        "intent": lambda: evaluate_intent(corpus, Model, workdir),
+        "cohere": lambda: evaluate_cohere(corpus, Model),
+        "batch": lambda: evaluate_batch(corpus, Model, args.batch_size),
+        "cache": lambda: evaluate_cache(corpus, Model),
+        "routed": lambda: evaluate_routed(corpus, Model),
+    }
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "corpus": os.path.basename(args.corpus),
+            "live": args.live,
+            "config": servers.config if servers else None,
+        },
+        "backends": {},
+    }
+    for backend in backends:
+        outputs = evaluators[backend]()
+        if outputs is None:
+            continue
+        results["backends"][backend] = score(corpus, outputs)
+        report(backend, results["backends"][backend], args.verbose)
+
+    if servers:
+        servers.stop()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"decisions-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved: {output}")
+
+if __name__ == "__main__":
+    main()
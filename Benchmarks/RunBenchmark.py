@@ -0,0 +1,242 @@
+"""
+Offline end-to-end benchmark for PrismVoiceCore.
+
+Starts the local stand-in servers, points every backend at them through a
+throwaway .env, drives a scripted utterance corpus through the real command
+queue, decision model client, executor and LLM/search clients, and reports
+per-stage and end-to-end percentiles. Speech output and desktop automation
+are replaced by silent stand-ins so no app is launched and nothing is spoken.
+
+    python Benchmarks/RunBenchmark.py
+    python Benchmarks/RunBenchmark.py --corpus Benchmarks/Corpus/burst.json --mode burst
+    python Benchmarks/RunBenchmark.py --set cerebras.latency=1.5 --set cohere.error_rate=0.2
+    python Benchmarks/RunBenchmark.py --set cerebras.spike_rate=0.2 --set cerebras.spike=3 --env HedgeRequests=1
+    python Benchmarks/RunBenchmark.py --compare Benchmarks/Results/mixed-20250101-120000.json
+
+Results are written to Benchmarks/Results/ as JSON for later comparison.
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "Results")
+
+sys.path.insert(0, REPO_ROOT)
+from Benchmarks.StandInServers import StandInServers
+
+def parse_overrides(pairs):
+    """['cerebras.latency=1.5'] -> {'cerebras': {'latency': 1.5}}"""
+    config = {}
+    for pair in pairs:
+        key, value = pair.split("=", 1)
+        server, field = key.split(".", 1)
+        config.setdefault(server, {})[field] = float(value)
+    return config
+
+def install_local_outputs(speech_wps):
+    """Silent Speak and no-op automation, installed before Main is imported"""
+    tts = types.ModuleType("Backend.TextToSpeech")
+
+    def Speak(Text):
+        if speech_wps:
+            time.sleep(len(str(Text).split()) / speech_wps)
+        return True
+
+    def SpeakStream(Sentences, on_sentence=None):
+        for Sentence in Sentences:
+            if on_sentence:
+                on_sentence(Sentence)
+            Speak(Sentence)
+        return True
+
+    tts.Speak = Speak
+    tts.SpeakWithoutPrint = Speak
+    tts.SpeakStream = SpeakStream
+    tts.StopSpeaking = lambda: None
+    sys.modules["Backend.TextToSpeech"] = tts
+
+    automation = types.ModuleType("Backend.Automation")
+    names = ["OpenApplication", "OpenWebsite", "CloseApplication", "PlayMusic", "GoogleSearch",
+             "YoutubeSearch", "VolumeUp", "VolumeDown", "Mute", "Unmute", "Screenshot"]
+    for name in names:
+        setattr(automation, name, lambda *args, _name=name: f"{_name} {' '.join(map(str, args))}".strip())
+    automation.__all__ = names
+    sys.modules["Backend.Automation"] = automation
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+def start_core(Main, use_async):
+    core = Main.PrismVoiceCore(gui_mode='console', use_async=use_async)
+    if use_async:
+        target = lambda: asyncio.run(Main.AsyncPipeline(core).run())
+    else:
+        target = core.command_processor_thread
+    threading.Thread(target=target, daemon=True).start()
+    return core
+
+def run_corpus(core, corpus, iterations, mode, timeout):
+    """Returns (end-to-end latencies in ms, rejected count, wall seconds)"""
+    latencies = []
+    rejected = 0
+    wall_start = time.time()
+
+    for _ in range(iterations):
+        if mode == "sequential":
+            for item in corpus:
+                start = time.time()
+                command = core.submit_command(item["utterance"], source='benchmark')
+                if command is None:
+                    rejected += 1
+                    continue
+                command.done.wait(timeout)
+                latencies.append((time.time() - start) * 1000)
+        else:
+            submitted = []
+            for item in corpus:
+                command = core.submit_command(item["utterance"], source='benchmark')
+                if command is None:
+                    rejected += 1
+                else:
+                    submitted.append((time.time(), command))
+            for start, command in submitted:
+                command.done.wait(timeout)
+                latencies.append((command.finished_at - start) * 1000)
+
+    return latencies, rejected, time.time() - wall_start
+
+def compare(results, baseline_path, threshold):
+    """Print p50/p95 deltas against a saved run. Returns True if anything regressed."""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+
+    rows = [("end_to_end", results["end_to_end"], baseline["end_to_end"])]
+    for stage, stats in results["stages"].items():
+        if stage in baseline["stages"]:
+            rows.append((stage, stats, baseline["stages"][stage]))
+
+    regressed = False
+    print(f"\nComparison with {os.path.basename(baseline_path)} (commit {baseline['meta']['commit']})")
+    print(f"{'Stage':<28}{'p50 Δ%':>10}{'p95 Δ%':>10}")
+    for stage, now, before in rows:
+        deltas = []
+        for key in ("p50", "p95"):
+            deltas.append((now[key] - before[key]) / before[key] * 100 if before[key] else 0.0)
+        flag = " REGRESSION" if max(deltas) > threshold else ""
+        regressed = regressed or bool(flag)
+        print(f"{stage:<28}{deltas[0]:>+10.1f}{deltas[1]:>+10.1f}{flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description='P.R.I.S.M offline benchmark')
+    parser.add_argument('--corpus', default=os.path.join(BENCH_DIR, "Corpus", "mixed.json"))
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--mode', choices=['sequential', 'burst'], default='sequential',
+                        help='sequential: one utterance at a time; burst: whole corpus queued at once')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Use the asyncio pipeline')
+    parser.add_argument('--set', dest='overrides', action='append', default=[],
+                        help='Stand-in setting, e.g. cerebras.latency=1.0 or cohere.error_rate=0.1')
+    parser.add_argument('--env', dest='env', action='append', default=[],
+                        help='Extra .env entry for the assistant, e.g. HedgeRequests=1')
+    parser.add_argument('--speech-wps', type=float, default=0,
+                        help='Simulated speaking rate in words/second (0 = instant)')
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--compare', help='Saved result JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=10, help='Regression threshold in percent')
+    parser.add_argument('--output', help='Result file (default Benchmarks/Results/<corpus>-<time>.json)')
+    args = parser.parse_args()
+
+    with open(args.corpus, "r") as f:
+        corpus = json.load(f)
+    config = parse_overrides(args.overrides)
+    servers = StandInServers(config, {item["utterance"]: item["decision"] for item in corpus}).start()
+
+    # Throwaway working directory: its .env points the backends at the stand-ins
+    workdir = tempfile.mkdtemp(prefix="prism-bench-")
+    with open(os.path.join(workdir, ".env"), "w") as f:
+        for key, value in servers.env().items():
+            f.write(f"{key}={value}\n")
+        for entry in args.env:
+            f.write(f"{entry}\n")
+    os.chdir(workdir)
+
+    install_local_outputs(args.speech_wps)
+    import Main
+    from Backend.Tracer import tracer, Percentile
+    tracer.enable(os.path.join(workdir, "Data", "Trace.jsonl"))
+
+    # What the assistant does at startup: open connections before the first query
+    if Main.HttpPool.HttpPrewarm:
+        Main.HttpPool.pool.warm([url for key, url in servers.env().items() if key.endswith("URL")])
+    core = start_core(Main, args.use_async)
+    latencies, rejected, wall = run_corpus(core, corpus, args.iterations, args.mode, args.timeout)
+    core.running = False
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "corpus": os.path.basename(args.corpus),
+            "iterations": args.iterations,
+            "mode": args.mode,
+            "async": args.use_async,
+            "config": servers.config,
+        },
+        "end_to_end": {
+            "count": len(latencies),
+            "p50": Percentile(latencies, 50),
+            "p95": Percentile(latencies, 95),
+            "p99": Percentile(latencies, 99),
+        },
+        "throughput_qps": len(latencies) / wall if wall else 0.0,
+        "rejected": rejected,
+        "stages": tracer.summary(),
+        "fast_path": Main.Model.matcher.stats() if Main.Model.loaded else None,
+        "decision_cache": Main.Model.cache.stats() if Main.Model.loaded else None,
+        "intent_model": Main.Model.intent_model.stats() if Main.Model.loaded else None,
+        "speculation": Main.speculator.stats(),
+        "task_optimizer": Main.optimizer.stats(),
+        "breakers": Main.health.stats(),
+        "hedging": Main.hedger.stats(),
+        "answer_cache": Main.Chatbot.answers.stats() if Main.Chatbot.loaded else None,
+        "memory": Main.Chatbot.memory.stats() if Main.Chatbot.loaded else None,
+        "http_pool": Main.HttpPool.pool.stats() if Main.HttpPool.loaded else None,
+        "servers": servers.stats(),
+    }
+    servers.stop()
+
+    tracer.report()
+    e2e = results["end_to_end"]
+    print(f"\nEnd-to-end: n={e2e['count']} p50={e2e['p50']:.1f} ms p95={e2e['p95']:.1f} ms "
+          f"p99={e2e['p99']:.1f} ms | {results['throughput_qps']:.2f} queries/s | rejected={rejected}")
+    first_audio = results["stages"].get("turn.first_audio")
+    if first_audio:
+        print(f"Time to first audio: p50={first_audio['p50']:.1f} ms p95={first_audio['p95']:.1f} ms")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    corpus_name = os.path.splitext(os.path.basename(args.corpus))[0]
+    output = args.output or os.path.join(RESULTS_DIR, f"{corpus_name}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved: {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
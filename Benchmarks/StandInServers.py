@@ -0,0 +1,259 @@
+"""
+Local HTTP stand-ins for the services P.R.I.S.M talks to:
+
+    cerebras     POST /v1/chat/completions   (OpenAI-style SSE stream)
+    cohere       POST /v1/chat               (chat_stream JSON lines and chat)
+    serper       POST /search
+    huggingface  POST /models/<model>        (PNG bytes)
+
+Each server has its own latency (time to first byte), token rate and error
+rate, so benchmarks can reproduce slow providers, outages and rate limits
+without touching the real APIs.
+"""
+
+import json
+import time
+import uuid
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CONFIG = {
+    "cerebras": {"latency": 0.25, "token_rate": 400, "error_rate": 0.0, "tokens": 60},
+    "cohere": {"latency": 0.35, "token_rate": 150, "error_rate": 0.0, "tokens": 60},
+    "serper": {"latency": 0.3, "token_rate": 0, "error_rate": 0.0},
+    "huggingface": {"latency": 2.0, "token_rate": 0, "error_rate": 0.0},
+}
+
+# 1x1 transparent PNG
+PNG_BYTES = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c63000100000500010d0a2db40000000049454e44ae426082"
+)
+
+ANSWER_WORDS = ("Prism here. This is a scripted stand-in answer used for offline "
+                "benchmarks, streamed token by token at a configurable rate. ").split()
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading (cancelled query, losing hedge): end the stream quietly
+            self.close_connection = True
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b"{}"
+        try:
+            return json.loads(body)
+        except ValueError:
+            return {}
+
+    def inject_failure(self):
+        """Simulate first-byte latency (plus a spike at spike_rate) and, at error_rate, a 429/500"""
+        time.sleep(self.config["latency"])
+        if random.random() < self.config.get("spike_rate", 0):
+            time.sleep(self.config.get("spike", 0))
+        self.server.stats["requests"] += 1
+        if random.random() < self.config["error_rate"]:
+            self.server.stats["errors"] += 1
+            status = random.choice([429, 500, 503])
+            self.send_json({"error": "injected failure", "message": "injected failure"}, status)
+            return True
+        return False
+
+    def do_HEAD(self):
+        """Connection warm-up: an empty answer on a kept-alive connection"""
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def start_stream(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def token_delay(self):
+        rate = self.config["token_rate"]
+        if rate:
+            time.sleep(1 / rate)
+
+    def answer_tokens(self):
+        count = self.config.get("tokens", 40)
+        return [ANSWER_WORDS[i % len(ANSWER_WORDS)] + " " for i in range(count)]
+
+class CerebrasHandler(StandInHandler):
+    def do_POST(self):
+        request = self.read_json()
+        if self.inject_failure():
+            return
+        created = int(time.time())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        def chunk(delta, finish=None):
+            return {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                    "model": request.get("model", "llama-3.3-70b"), "system_fingerprint": "fp_stand_in",
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+
+        self.start_stream("text/event-stream")
+        self.write_chunk(f"data: {json.dumps(chunk({'role': 'assistant'}))}\n\n".encode())
+        for token in self.answer_tokens():
+            self.token_delay()
+            self.write_chunk(f"data: {json.dumps(chunk({'content': token}))}\n\n".encode())
+        self.write_chunk(f"data: {json.dumps(chunk({}, 'stop'))}\n\n".encode())
+        self.write_chunk(b"data: [DONE]\n\n")
+        self.end_stream()
+
+class CohereHandler(StandInHandler):
+    def do_POST(self):
+        request = self.read_json()
+        if self.inject_failure():
+            return
+        message = request.get("message", "")
+        decisions = self.server.decisions
+        # Decision-model requests carry the DMM preamble; answer them from the corpus script
+        if "Decision-Making Model" in request.get("preamble", ""):
+            if "one line per query" in request.get("preamble", ""):
+                # Batch decision: numbered utterances in, numbered decisions out
+                lines = []
+                for line in message.splitlines():
+                    number, _, utterance = line.partition(". ")
+                    lines.append(f"{number}: {decisions.get(utterance.strip().lower(), f'general {utterance}')}")
+                text = "\n".join(lines)
+            else:
+                text = decisions.get(message.strip().lower(), f"general {message}")
+            tokens = [token + " " for token in text.split(" ")]
+        else:
+            tokens = self.answer_tokens()
+            text = "".join(tokens)
+
+        generation_id = uuid.uuid4().hex
+        if not request.get("stream"):
+            time.sleep(len(tokens) / self.config["token_rate"] if self.config["token_rate"] else 0)
+            self.send_json({"text": text, "generation_id": generation_id, "response_id": generation_id,
+                            "finish_reason": "COMPLETE", "chat_history": [], "meta": {}})
+            return
+
+        self.start_stream("application/stream+json")
+        event = {"event_type": "stream-start", "generation_id": generation_id, "is_finished": False}
+        self.write_chunk((json.dumps(event) + "\n").encode())
+        for token in tokens:
+            self.token_delay()
+            event = {"event_type": "text-generation", "text": token, "is_finished": False}
+            self.write_chunk((json.dumps(event) + "\n").encode())
+        event = {"event_type": "stream-end", "finish_reason": "COMPLETE", "is_finished": True,
+                 "response": {"text": text, "generation_id": generation_id, "response_id": generation_id,
+                              "finish_reason": "COMPLETE", "chat_history": []}}
+        self.write_chunk((json.dumps(event) + "\n").encode())
+        self.end_stream()
+
+class SerperHandler(StandInHandler):
+    def do_POST(self):
+        request = self.read_json()
+        if self.inject_failure():
+            return
+        query = request.get("q", "")
+        organic = [{"title": f"Result {i} for {query}", "snippet": f"Scripted snippet {i} about {query}.",
+                    "link": f"https://example.com/{i}"} for i in range(1, 6)]
+        self.send_json({"searchParameters": {"q": query}, "organic": organic})
+
+class HuggingFaceHandler(StandInHandler):
+    def do_POST(self):
+        self.read_json()
+        if self.inject_failure():
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(PNG_BYTES)))
+        self.end_headers()
+        self.wfile.write(PNG_BYTES)
+
+HANDLERS = {
+    "cerebras": CerebrasHandler,
+    "cohere": CohereHandler,
+    "serper": SerperHandler,
+    "huggingface": HuggingFaceHandler,
+}
+
+class StandInServers:
+    """Starts every stand-in on a free loopback port"""
+
+    def __init__(self, config=None, decisions=None):
+        self.config = {name: dict(DEFAULT_CONFIG[name], **(config or {}).get(name, {}))
+                       for name in DEFAULT_CONFIG}
+        self.decisions = {k.strip().lower(): v for k, v in (decisions or {}).items()}
+        self.servers = {}
+
+    def start(self):
+        for name, handler in HANDLERS.items():
+            server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+            server.daemon_threads = True
+            server.config = self.config[name]
+            server.decisions = self.decisions
+            server.stats = {"requests": 0, "errors": 0}
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.servers[name] = server
+        return self
+
+    def url(self, name):
+        host, port = self.servers[name].server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """.env entries pointing every backend at the stand-ins"""
+        return {
+            "CerebrasAPIKey": "stand-in",
+            "CohereAPIKey": "stand-in",
+            "SerperAPIKey": "stand-in",
+            "HuggingFaceAPIKey": "stand-in",
+            "CerebrasBaseURL": self.url("cerebras"),
+            "CohereBaseURL": self.url("cohere"),
+            "SerperURL": self.url("serper") + "/search",
+            "HuggingFaceURL": self.url("huggingface") + "/models/stand-in",
+        }
+
+    def stats(self):
+        return {name: dict(server.stats) for name, server in self.servers.items()}
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    servers = StandInServers().start()
+    for key, value in servers.env().items():
+        print(f"{key}={value}")
+    print("\nStand-ins running, paste the lines above into .env. Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        servers.stop()
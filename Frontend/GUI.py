@@ -6,8 +6,9 @@ import math
 import random
 
 class JarvisStyleGUI:
-    def __init__(self, root):
+    def __init__(self, root, core_instance=None):
         self.root = root
+        self.core = core_instance
         self.root.title("Prism")
         
         # Fullscreen setup
@@ -41,6 +42,9 @@ class JarvisStyleGUI:
         # Ripple effects
         self.ripples = []
         
+        # State bus of the core when running in-process, file protocol otherwise
+        self.bus = self.core.bus if self.core else None
+        
         # File paths
         self.files = {
             'status': 'Frontend/Files/Status.data',
@@ -384,12 +388,22 @@ class JarvisStyleGUI:
         self.root.after(16, self.animate)
     
     def write_file(self, file_key, content):
+        if self.bus:
+            self.bus.publish(file_key, content == '1' if file_key == 'mic' else content)
+            return
         try:
             with open(self.files[file_key], 'w') as f:
                 f.write(str(content))
         except Exception as e:
             print(f"Error writing to {file_key}: {e}")
     
+    def wait_status(self, version):
+        """Block until the status changes (bus) or the next poll tick (file)"""
+        if self.bus:
+            return self.bus.wait_for_change('status', version, timeout=1)
+        time.sleep(0.1)
+        return self.read_file('status'), version
+    
     def read_file(self, file_key):
         try:
             with open(self.files[file_key], 'r') as f:
@@ -408,10 +422,11 @@ class JarvisStyleGUI:
         """Monitor status changes"""
         def monitor():
             last_status = ""
+            version = 0
             
             while self.running:
                 try:
-                    status = self.read_file('status')
+                    status, version = self.wait_status(version)
                     
                     if status and status != last_status:
                         # Check for shutdown
@@ -432,8 +447,6 @@ class JarvisStyleGUI:
                         
                         last_status = status
                     
-                    time.sleep(0.1)
-                    
                 except Exception as e:
                     if self.running:
                         print(f"Monitoring error: {e}")
@@ -442,9 +455,9 @@ class JarvisStyleGUI:
         thread = threading.Thread(target=monitor, daemon=True)
         thread.start()
 
-def main():
+def main(core_instance=None):
     root = tk.Tk()
-    app = JarvisStyleGUI(root)
+    app = JarvisStyleGUI(root, core_instance)
     root.mainloop()
 
 if __name__ == "__main__":
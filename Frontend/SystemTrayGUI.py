@@ -60,6 +60,9 @@ class PrismSystemTray:
         self.particles = []
         self.ripples = []
         
+        # State bus of the core when running in-process, file protocol otherwise
+        self.bus = self.core.bus if self.core else None
+        
         # File paths
         self.files = {
             'status': 'Frontend/Files/Status.data',
@@ -309,12 +312,22 @@ class PrismSystemTray:
         sys.exit(0)
     
     def write_file(self, file_key, content):
+        if self.bus:
+            self.bus.publish(file_key, content == '1' if file_key == 'mic' else content)
+            return
         try:
             with open(self.files[file_key], 'w') as f:
                 f.write(str(content))
         except Exception as e:
             print(f"Error writing to {file_key}: {e}")
     
+    def wait_status(self, version):
+        """Block until the status changes (bus) or the next poll tick (file)"""
+        if self.bus:
+            return self.bus.wait_for_change('status', version, timeout=1)
+        time.sleep(0.1)
+        return self.read_file('status'), version
+    
     def read_file(self, file_key):
         try:
             with open(self.files[file_key], 'r') as f:
@@ -325,10 +338,11 @@ class PrismSystemTray:
     def start_monitoring(self):
         def monitor():
             last_status = ""
+            version = 0
             
             while True:
                 try:
-                    status = self.read_file('status')
+                    status, version = self.wait_status(version)
                     if status != last_status:
                         if status and ('listening' in status.lower() or 'processing' in status.lower()):
                             self.listening = True
@@ -341,7 +355,6 @@ class PrismSystemTray:
                         
                         last_status = status
                     
-                    time.sleep(0.1)
                 except Exception as e:
                     time.sleep(1)
         
@@ -1,250 +1,382 @@
 import os
 import sys
+import asyncio
 import threading
 import time
 from datetime import datetime
-import queue
 
 # Add Backend to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'Backend'))
 
-# Import backend modules
-from Backend.Chatbot import ChatBot
-from Backend.Model import FirstLayerDMM
-from Backend.Automation import *
-from Backend.RealtimeSearchEngine import RealtimeSearchEngine
-from Backend.ImageGeneration import GenerateImageWithRetry
-from Backend.TextToSpeech import Speak
+# Profile imports from here on
+from Backend.LazyLoader import LazyModule, Preload, profiler
+
+# Backends are imported on first use: each one builds SDK clients, voices or
+# directories at import time
+Model = LazyModule("Backend.Model")
+TextToSpeech = LazyModule("Backend.TextToSpeech")
+# Shared keep-alive connections for the backends' HTTP calls
+HttpPool = LazyModule("Backend.HttpPool")
+
+# Registers the built-in capabilities (lazily, like the backends above)
+from Backend.Capabilities import Chatbot, Reminder
+from Backend.Handlers import registry, NoArguments, PRIORITY_INSTANT
+
+# Imported in the background once the assistant is listening
+PRELOAD_MODULES = [Model, Chatbot]
+
+from Backend.StateBus import bus
+from Backend.TranscriptChannel import channel as transcripts, TranscriptServer
+from Backend.TaskExecutor import TaskExecutor
+from Backend.CommandQueue import CommandQueue, PRIORITY_CONTROL, PRIORITY_NORMAL
+from Backend.QueryContext import QueryContext, QueryCancelled, QueryBudget
+from Backend.AsyncPipeline import AsyncPipeline
+from Backend.Tracer import tracer
+from Backend.Speculation import speculator
+from Backend.TaskOptimizer import optimizer
+from Backend.CircuitBreaker import health
+from Backend.Hedging import hedger
+
+PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Plugins')
 
 class PrismVoiceCore:
-    def __init__(self, gui_mode='tray'):
+    def __init__(self, gui_mode='tray', use_async=False, startup_profile=False):
         self.running = True
         self.gui_mode = gui_mode
-        self.files = {
-            'status': 'Frontend/Files/Status.data',
-            'mic': 'Frontend/Files/Mic.data',
-        }
+        self.use_async = use_async
+        self.startup_profile = startup_profile
+        self.bus = bus
+        
+        # Track when the mic last came back on to reject TTS echo
+        self.mic_enabled_at = 0
+        self.bus.subscribe('mic', self.on_mic_change)
+        
+        # Bounded priority queue; control commands preempt the running one
+        self.command_queue = CommandQueue(on_control=self.preempt)
+        self.inflight = set()
+        self.executor = TaskExecutor()
+        self.speech_lock = threading.Lock()
         
-        # Command queue for async processing
-        self.command_queue = queue.Queue()
-        self.is_processing = False
-        self.processing_lock = threading.Lock()
+        # Exit needs the core; everything else registers itself. Exit is a
+        # barrier so it runs after the other tasks of its query.
+        registry.register("exit", self.exit_task, parser=NoArguments, parallel_safe=False,
+                          priority=PRIORITY_INSTANT)
+        registry.load_plugins(PLUGIN_DIR)
         
         # Ensure directories exist
-        os.makedirs('Frontend/Files', exist_ok=True)
         os.makedirs('Data', exist_ok=True)
         
-        # Initialize files
-        for file_path in self.files.values():
-            if not os.path.exists(file_path):
-                open(file_path, 'w').close()
-        
-        self.write_file('status', 'Initializing...')
-        self.write_file('mic', '1')
+        self.set_status('Initializing...')
+        self.set_mic(True)
         print("P.R.I.S.M Voice Core initialized.")
         
-    def write_file(self, file_key, content):
-        try:
-            with open(self.files[file_key], 'w') as f:
-                f.write(str(content))
-        except Exception as e:
-            print(f"Error writing to {file_key}: {e}")
-            
-    def read_file(self, file_key):
+    def set_status(self, status):
+        self.bus.publish('status', status)
+    
+    def set_mic(self, enabled):
+        self.bus.publish('mic', enabled)
+    
+    def on_mic_change(self, enabled):
+        if enabled:
+            self.mic_enabled_at = time.time()
+    
+    def submit_command(self, text, source='voice', record=None):
+        """Queue a command, telling the user when the queue is full"""
+        command = self.command_queue.put(text, source)
+        if command is None:
+            print(f"[BUSY]: Command queue full, dropped: {text}")
+            self.set_status('Busy - please repeat')
+        elif record:
+            # Speech recognition stages of this utterance
+            trace_id = command.ctx.trace_id
+            command.started = command.ctx.started = record.started
+            tracer.record(trace_id, "stt.speech", record.started, record.speech_ended)
+            tracer.record(trace_id, "stt.endpointing", record.speech_ended, record.ended)
+            tracer.record(trace_id, "stt.delivery", record.ended, time.time())
+        return command
+    
+    def begin_command(self, command):
+        self.inflight.add(command)
+        # The budget starts now; time spent queued doesn't count against it
+        command.ctx.set_deadline()
+        tracer.record(command.ctx.trace_id, "queue.wait", command.enqueued_at, time.time())
+    
+    def finish_command(self, command):
+        self.inflight.discard(command)
+        command.finished_at = time.time()
+        tracer.record(command.ctx.trace_id, "turn.total", command.started, command.finished_at, query=command.text)
+        command.done.set()
+    
+    def preempt(self, command):
+        """Cancel the running commands in favour of a control command"""
+        running = [c for c in list(self.inflight) if c.priority != PRIORITY_CONTROL]
+        for current in running:
+            print(f"[PREEMPT]: '{command.text}' interrupts '{current.text}'")
+            current.ctx.cancel(f"preempted by '{command.text}'")
+        if running:
+            if TextToSpeech.loaded:
+                TextToSpeech.StopSpeaking()
+    
+    def process_command(self, command):
+        """Run one queued command"""
+        self.begin_command(command)
         try:
-            with open(self.files[file_key], 'r') as f:
-                return f.read().strip()
-        except:
-            return ""
+            if command.priority == PRIORITY_CONTROL:
+                # Control commands skip the decision model
+                task = command.control_task
+                print(f"\n[CONTROL]: {command.text}")
+                if task == "exit":
+                    self.command_queue.clear()
+                if task:
+                    self.process_query(command.text, ctx=command.ctx, tasks=[task])
+            else:
+                # command.tasks is set when it was decided together with others
+                self.process_query(command.text, ctx=command.ctx, tasks=command.tasks)
+        finally:
+            self.finish_command(command)
     
-    def process_query(self, query):
+    def process_query(self, query, ctx=None, tasks=None):
         """Main query processing logic - now with faster execution"""
         if not query or len(query.strip()) < 2:
             return
         
-        with self.processing_lock:
-            if self.is_processing:
-                print("[BUSY]: Already processing a command, queuing...")
-                return
-            self.is_processing = True
+        ctx = ctx or QueryContext(query, budget=QueryBudget)
         
         try:
             print(f"\n[USER SAID]: {query}")
-            self.write_file('status', 'Processing...')
+            self.bus.publish('transcript', query)
+            self.set_status('Processing...')
             
-            # Get decision from Model
-            tasks = FirstLayerDMM(query)
-            print(f"[TASKS]: {tasks}")
+            # Tasks start as the decision model streams them; results are
+            # spoken in order while the rest are still being decided
+            batch = self.executor.batch(ctx)
+            threading.Thread(target=self.dispatch_decision, args=(query, ctx, batch, tasks),
+                             daemon=True).start()
             
-            response = ""
-            
-            for task in tasks:
-                task = task.strip()
-                
-                # Exit command
-                if task == "exit":
-                    response = "Goodbye sir. Shutting down P.R.I.S.M."
-                    self.running = False
-                    
-                # General conversation
-                elif task.startswith("general"):
-                    q = task.replace("general", "").strip()
-                    response = ChatBot(q if q else query)
-                    
-                # Real-time search
-                elif task.startswith("realtime"):
-                    q = task.replace("realtime", "").strip()
-                    response = RealtimeSearchEngine(q if q else query)
-                    
-                # Open application/website
-                elif task.startswith("open"):
-                    target = task.replace("open", "").strip()
-                    if target:
-                        response = OpenApplication(target) if not target.startswith("http") else OpenWebsite(target)
-                    
-                # Close application
-                elif task.startswith("close"):
-                    app = task.replace("close", "").strip()
-                    if app:
-                        response = CloseApplication(app)
-                    
-                # Play music
-                elif task.startswith("play"):
-                    song = task.replace("play", "").strip()
-                    if song:
-                        response = PlayMusic(song)
-                    
-                # Google search
-                elif task.startswith("google search"):
-                    q = task.replace("google search", "").strip()
-                    if q:
-                        response = GoogleSearch(q)
-                    
-                # YouTube search
-                elif task.startswith("youtube search"):
-                    q = task.replace("youtube search", "").strip()
-                    if q:
-                        response = YoutubeSearch(q)
-                    
-                # Image generation
-                elif task.startswith("generate image"):
-                    prompt = task.replace("generate image", "").strip()
-                    if prompt:
-                        response = GenerateImageWithRetry(prompt)
-                    
-                # System controls
-                elif task.startswith("system"):
-                    cmd = task.replace("system", "").strip().lower()
-                    if "volume up" in cmd:
-                        response = VolumeUp()
-                    elif "volume down" in cmd:
-                        response = VolumeDown()
-                    elif "mute" in cmd:
-                        response = Mute()
-                    elif "unmute" in cmd:
-                        response = Unmute()
-                    elif "screenshot" in cmd:
-                        response = Screenshot()
-                
-                # Speak response
-                if response:
-                    print(f"[PRISM]: {response}")
-                    self.write_file('status', 'Speaking...')
-                    
-                    # CRITICAL: Disable mic BEFORE speaking
-                    self.write_file('mic', '0')
-                    time.sleep(0.1)  # Let mic disable
-                    
-                    Speak(response)
-                    
-                    # Re-enable mic AFTER speaking
-                    time.sleep(0.3)
-                    self.write_file('mic', '1')
+            for job, response, error in batch.results():
+                if error:
+                    print(f"[ERROR]: {job.name} failed: {error}")
+                    continue
+                ctx.check()
+                self.speak_response(response, ctx)
+        
+        except QueryCancelled as e:
+            print(f"[CANCELLED]: {query} ({e})")
                     
         except Exception as e:
             error_msg = f"Error: {str(e)}"
             print(f"[ERROR]: {error_msg}")
-            self.write_file('status', 'Error - Ready')
+            self.set_status('Error - Ready')
         
         finally:
-            with self.processing_lock:
-                self.is_processing = False
-            self.write_file('status', 'Listening...')
+            self.set_status('Listening...')
+    
+    def decide(self, query, ctx=None):
+        """Ask the decision model which tasks the query contains"""
+        return Model.FirstLayerDMM(query, ctx)
+    
+    def decide_stream(self, query, ctx=None):
+        """Like decide, but yields each task as soon as the model has written it"""
+        return Model.StreamDecision(query, ctx)
+    
+    def decide_batch(self, commands):
+        """
+        Decide a burst of queued commands in one model call, storing the
+        tasks on each command. Fewer than two commands needing the model
+        are left to the streamed decision (and speculation).
+        """
+        pending = [c for c in commands if c.priority == PRIORITY_NORMAL and c.tasks is None]
+        if len(pending) < 2 or sum(Model.NeedsModel(c.text) for c in pending) < 2:
+            return
+        try:
+            with tracer.span(pending[0].ctx.trace_id, "decision.batch", size=len(pending)):
+                decisions = Model.BatchDecision([c.text for c in pending])
+            for command, tasks in zip(pending, decisions):
+                command.tasks = tasks
+        except Exception as e:
+            print(f"[ERROR]: Batch decision failed: {e}")
+    
+    def dispatch_decision(self, query, ctx, batch, tasks=None):
+        """Add a job to the batch for each task as it is decided, then close the batch"""
+        start = time.time()
+        first = None
+        
+        # Race ChatBot against the decision model; used only if the decision
+        # turns out to be a lone 'general' task
+        speculation = None
+        if tasks is None and speculator.enabled and Model.NeedsModel(query):
+            speculation = speculator.start(query, ctx)
+        held = []
+        
+        try:
+            with tracer.span(ctx.trace_id, "decision"):
+                # Duplicates dropped and volume steps merged on the way to the executor
+                source = tasks if tasks is not None else self.decide_stream(query, ctx)
+                for task in optimizer.plan().stream(source):
+                    if first is None:
+                        first = time.time()
+                        tracer.record(ctx.trace_id, "decision.first_task", start, first)
+                    print(f"[TASK]: {task}")
+                    
+                    if speculation:
+                        held.append(task)
+                        if len(held) == 1 and task.startswith("general"):
+                            continue
+                        speculation.cancel()
+                        speculation = None
+                        for task in held:
+                            self.add_task(batch, task, query, ctx)
+                        continue
+                    self.add_task(batch, task, query, ctx)
+            
+            if speculation:
+                if held:
+                    print("[SPECULATION]: Using the answer started before the decision")
+                    batch.add(speculation.job())
+                else:
+                    speculation.cancel("no decision")
+        except Exception as e:
+            print(f"[ERROR]: Decision failed: {e}")
+            if speculation:
+                speculation.cancel("decision failed")
+        finally:
+            batch.close()
+    
+    def add_task(self, batch, task, query, ctx):
+        job = self.build_job(task, query, ctx)
+        if job:
+            batch.add(job)
+    
+    def build_job(self, task, query, ctx=None):
+        """Turn one decision task into a schedulable job via the handler registry"""
+        return registry.job(task, query, ctx)
+    
+    def exit_task(self):
+        self.running = False
+        return "Goodbye sir. Shutting down P.R.I.S.M."
+    
+    def speak_response(self, response, ctx=None):
+        """Speak a result: a string, or a SentenceStream spoken sentence by sentence as it generates"""
+        if not response:
+            return
+        streamed = not isinstance(response, str)
+        if not streamed:
+            print(f"[PRISM]: {response}")
+        self.set_status('Speaking...')
+        trace_id = ctx.trace_id if ctx else None
+        
+        def on_sentence(sentence):
+            print(f"[PRISM]: {sentence}")
+            self.first_audio(ctx)
+        
+        # Reminders are announced from their own timer thread
+        with self.speech_lock:
+            # CRITICAL: Disable mic BEFORE speaking
+            self.set_mic(False)
+            
+            try:
+                with tracer.span(trace_id, "tts.speak"):
+                    if streamed:
+                        TextToSpeech.SpeakStream(response, on_sentence)
+                    else:
+                        self.first_audio(ctx)
+                        TextToSpeech.Speak(response)
+            finally:
+                # Re-enable mic AFTER speaking
+                with tracer.span(trace_id, "tts.echo_guard"):
+                    time.sleep(0.3)
+                self.set_mic(True)
+    
+    def first_audio(self, ctx):
+        """Record time to first audio: from the start of the utterance to its first spoken answer"""
+        if ctx and ctx.first_audio is None:
+            ctx.first_audio = time.time()
+            tracer.record(ctx.trace_id, "turn.first_audio", ctx.started, ctx.first_audio)
+    
+    def announce(self, message):
+        """Speak something the user didn't ask for just now (e.g. a due reminder)"""
+        self.speak_response(message)
+        if not self.inflight:
+            self.set_status('Listening...')
     
     def command_processor_thread(self):
         """Background thread to process commands from queue"""
         while self.running:
             try:
-                # Get command with timeout
-                query = self.command_queue.get(timeout=1)
-                if query:
-                    self.process_query(query)
-                self.command_queue.task_done()
-            except queue.Empty:
-                continue
+                # Commands that queued up together are decided in one model call
+                commands = self.command_queue.get_batch(timeout=1)
+                self.decide_batch(commands)
+                for i, command in enumerate(commands):
+                    if not self.running:
+                        break
+                    if i and self.command_queue.control_pending():
+                        # Let the control command run first; the rest keep their decisions
+                        for dropped in self.command_queue.requeue(commands[i:]):
+                            dropped.done.set()
+                        break
+                    self.process_command(command)
             except Exception as e:
                 print(f"Processor error: {e}")
     
-    def monitor_voice_input(self):
-        """Monitor for voice input - OPTIMIZED"""
-        print("[VOICE MONITOR]: Starting...")
+    def start_speech_input(self):
+        """Start the transcript server and the recognizer"""
+        # The recognizer thread below delivers straight to this process's channel
+        transcripts.local = True
+        # Accept utterances from an out-of-process recognizer as well
+        TranscriptServer(transcripts).start()
         
         # Start SpeechToText in separate process
         voice_thread = threading.Thread(target=self.run_speech_to_text, daemon=True)
         voice_thread.start()
+    
+    def accept_utterance(self, record):
+        """Return the query for a transcript record, or None if it should be ignored"""
+        query = record.text.strip()
+        if len(query) <= 2:
+            return None
+        
+        # Speech that started while the mic was off is our own TTS echo
+        if not self.bus.get('mic') or record.started < self.mic_enabled_at:
+            print(f"[ECHO]: Ignored #{record.seq}: {query}")
+            return None
+        
+        print(f"[DETECTED #{record.seq}]: {query}")
+        return query
+    
+    def monitor_voice_input(self):
+        """Monitor for voice input - OPTIMIZED"""
+        print("[VOICE MONITOR]: Starting...")
+        
+        self.start_speech_input()
         
         # Start command processor
         processor = threading.Thread(target=self.command_processor_thread, daemon=True)
         processor.start()
         
-        voice_file = "Data/VoiceInput.txt"
-        last_query = ""
-        last_process_time = 0
+        cursor = transcripts.last_seq
         
         while self.running:
             try:
-                # Check mic status
-                mic_status = self.read_file('mic')
-                if mic_status != '1':
-                    time.sleep(0.3)
+                # Block until the recognizer delivers the next utterance
+                record = transcripts.get(cursor, timeout=1)
+                if record is None:
                     continue
+                cursor = record.seq
                 
-                # Don't check if currently processing
-                if self.is_processing:
-                    time.sleep(0.2)
-                    continue
-                
-                # Read voice input
-                if os.path.exists(voice_file):
-                    with open(voice_file, 'r') as f:
-                        query = f.read().strip()
-                    
-                    current_time = time.time()
-                    
-                    # Process if: new query AND not duplicate AND sufficient time passed
-                    if (query and 
-                        query != last_query and 
-                        len(query) > 2 and
-                        (current_time - last_process_time) > 2):  # 2 second cooldown
-                        
-                        print(f"[DETECTED]: {query}")
-                        
-                        # Clear file immediately
-                        with open(voice_file, 'w') as f:
-                            f.write("")
-                        
-                        # Queue command for processing
-                        self.command_queue.put(query)
-                        
-                        last_query = query
-                        last_process_time = current_time
-                
-                time.sleep(0.15)  # Fast polling
+                query = self.accept_utterance(record)
+                if query:
+                    self.submit_command(query, record=record)
                 
             except Exception as e:
                 print(f"Voice monitoring error: {e}")
                 time.sleep(1)
     
+    def run_async_pipeline(self):
+        """Run the asyncio pipeline (STT -> DMM -> handlers -> TTS) on its own loop"""
+        print("[VOICE MONITOR]: Starting asyncio pipeline...")
+        self.start_speech_input()
+        asyncio.run(AsyncPipeline(self).run())
+    
     def run_speech_to_text(self):
         """Run the speech to text module"""
         try:
@@ -268,7 +400,9 @@ class PrismVoiceCore:
                 
                 if user_input:
                     if user_input.lower() in ['exit', 'quit', 'bye']:
-                        self.process_query("exit")
+                        command = self.submit_command("exit", source='console')
+                        if command:
+                            command.done.wait(timeout=10)
                         break
                     elif user_input.lower() == 'help':
                         print("\nCommands:")
@@ -278,7 +412,7 @@ class PrismVoiceCore:
                         print("- Search: 'search python', 'youtube cats'")
                         print("- Exit: 'exit', 'quit'")
                     else:
-                        self.command_queue.put(user_input)
+                        self.submit_command(user_input, source='console')
                         
             except KeyboardInterrupt:
                 print("\n[SHUTDOWN]...")
@@ -287,6 +421,14 @@ class PrismVoiceCore:
             except Exception as e:
                 print(f"[ERROR]: {e}")
     
+    def greet(self):
+        TextToSpeech.Speak("P.R.I.S.M is online and ready, sir.")
+        time.sleep(0.5)
+        self.set_mic(True)  # Ensure mic is on after greeting
+    
+    def warm_connections(self):
+        HttpPool.pool.start_warming()
+    
     def run(self):
         """Main run loop"""
         print("\n" + "="*70)
@@ -297,27 +439,51 @@ class PrismVoiceCore:
         print("[SYSTEM]: Press Ctrl+C to exit.\n")
         
         # Start voice monitor
-        voice_thread = threading.Thread(target=self.monitor_voice_input, daemon=True)
+        monitor = self.run_async_pipeline if self.use_async else self.monitor_voice_input
+        voice_thread = threading.Thread(target=monitor, daemon=True)
         voice_thread.start()
         
         # Set status
-        self.write_file('status', 'Listening...')
-        
-        # Greeting
-        Speak("P.R.I.S.M is online and ready, sir.")
-        time.sleep(0.5)
-        self.write_file('mic', '1')  # Ensure mic is on after greeting
-        
+        self.set_status('Listening...')
+        profiler.mark("listening")
         print("[SYSTEM]: Listening...\n")
+        if self.startup_profile:
+            profiler.report()
+        
+        # Greeting runs in the background so startup doesn't wait for TTS
+        threading.Thread(target=self.greet, daemon=True).start()
+        # Connections to the APIs open while the backends preload
+        threading.Thread(target=self.warm_connections, daemon=True).start()
+        Preload(PRELOAD_MODULES)
+        Reminder.scheduler.start(self.announce)
         
         # Console input
         self.console_input_monitor()
         
         # Shutdown
         print("\n[SHUTDOWN]: Closing P.R.I.S.M...")
-        self.write_file('status', 'Shutting down...')
-        self.write_file('mic', '0')
-        Speak("Goodbye sir.")
+        self.set_status('Shutting down...')
+        self.set_mic(False)
+        TextToSpeech.Speak("Goodbye sir.")
+        
+        if Model.loaded:
+            Model.matcher.report()
+            Model.cache.report()
+            Model.intent_model.report()
+        if Chatbot.loaded:
+            Chatbot.answers.report()
+            Chatbot.memory.report()
+        if any(optimizer.stats().values()):
+            optimizer.report()
+        if speculator.stats()["started"]:
+            speculator.report()
+        health.report()
+        if hedger.stats()["requests"]:
+            hedger.report()
+        if HttpPool.loaded:
+            HttpPool.pool.report()
+        if tracer.enabled:
+            tracer.report()
 
 def main():
     import argparse
@@ -325,10 +491,22 @@ def main():
     parser = argparse.ArgumentParser(description='P.R.I.S.M Voice Assistant')
     parser.add_argument('--mode', choices=['tray', 'full', 'console'], default='tray',
                        help='GUI mode: tray (system tray), full (fullscreen), console (no GUI)')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                       help='Run the voice pipeline as asyncio stages instead of threads')
+    parser.add_argument('--profile', action='store_true',
+                       help='Trace per-stage latency to Data/Trace.jsonl and print percentiles on exit')
+    parser.add_argument('--startup-profile', action='store_true',
+                       help='Print import and initialization time per module once listening')
     args = parser.parse_args()
     
+    if args.profile:
+        tracer.enable()
+        print("[PROFILE]: Tracing to Data/Trace.jsonl")
+    
     # Start core
-    core = PrismVoiceCore(gui_mode=args.mode)
+    with profiler.timed("PrismVoiceCore"):
+        core = PrismVoiceCore(gui_mode=args.mode, use_async=args.use_async,
+                              startup_profile=args.startup_profile)
     
     # Start GUI
     try:
@@ -340,15 +518,13 @@ def main():
             
         elif args.mode == 'full':
             from Frontend.GUI import main as gui_main
-            gui_thread = threading.Thread(target=gui_main, daemon=False)
+            gui_thread = threading.Thread(target=lambda: gui_main(core), daemon=False)
             gui_thread.start()
             print("[GUI]: Full interface launched.")
         
         else:
             print("[MODE]: Console only.")
         
-        time.sleep(1)
-        
     except Exception as e:
         print(f"[WARNING]: GUI error: {e}")
         print("[MODE]: Console fallback.")